@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+import time
+import statistics
+import subprocess
+
+# =========================
+# SETTINGS
+# =========================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNS = 5
+HEAVY_MODULES = ("pandas", "sklearn", "scipy", "joblib")
+
+# Process start -> first prediction must stay under this
+COLD_START_BUDGET_MS = 1000
+
+# Runs in a fresh interpreter; reports what it paid for and when
+CHILD = """
+import sys, time, json
+start = time.perf_counter()
+{preload}
+from predict import Predictor
+imported = time.perf_counter()
+Predictor().predict(["cough", "high_fever"])
+done = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "first_prediction_ms": (done - start) * 1000,
+    "heavy_modules": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+SCENARIOS = {
+    "predict.py (lazy imports)": "",
+    "pandas + sklearn preloaded": "import pandas, joblib, sklearn.ensemble",
+}
+
+
+def run_child(preload):
+    code = CHILD.format(preload=preload, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    wall = (time.perf_counter() - start) * 1000
+    return dict(json.loads(out.strip().splitlines()[-1]), wall_ms=wall)
+
+
+def import_profile(module="predict", top=5):
+    """Slowest imports behind `module`, from python -X importtime"""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=BASE_DIR, capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+# =========================
+# BENCHMARK
+# =========================
+if __name__ == "__main__":
+    print(f"🧊 Cold start, median of {RUNS} fresh processes")
+    worst = 0.0
+    for label, preload in SCENARIOS.items():
+        runs = [run_child(preload) for _ in range(RUNS)]
+        median = {k: statistics.median(r[k] for r in runs)
+                  for k in ("import_ms", "first_prediction_ms", "wall_ms")}
+        print(f"\n⏱️ {label}")
+        print("--------------------------------")
+        print(f"imports               : {median['import_ms']:8.1f} ms")
+        print(f"start → 1st prediction: {median['first_prediction_ms']:8.1f} ms (in-process)")
+        print(f"process wall time     : {median['wall_ms']:8.1f} ms")
+        print(f"heavy modules loaded  : {', '.join(runs[0]['heavy_modules']) or 'none'}")
+        if not preload:
+            worst = median["wall_ms"]
+
+    print("\n📦 Slowest imports behind `import predict`")
+    for ms, name in import_profile():
+        print(f"  {ms:8.1f} ms  {name}")
+
+    ok = worst <= COLD_START_BUDGET_MS
+    print(f"\n{'✅' if ok else '❌'} cold start {worst:.0f} ms (budget {COLD_START_BUDGET_MS} ms)")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,98 @@
+import sys
+import time
+import warnings
+import numpy as np
+from dataclasses import replace
+
+from dataset import load_dataset, TESTING_PATH
+from training import balanced_rows, balanced_distinct_rows, fit_forest, RANDOM_STATE
+
+# =========================
+# DUPLICATE-COLLAPSING TRAINING BENCHMARK
+# =========================
+# Fits the category forest on every balanced row and on the distinct rows
+# with copy counts, on Training.csv and on Training.csv repeated SCALE
+# times (a stand-in for a larger corpus with the same patterns).
+#
+# "Equivalent" is judged against the forest's own randomness: the
+# full-row recipe is also refitted with another seed, and the collapsed
+# model should differ from the reference no more than that refit does.
+
+SCALES = [1, 10]
+OTHER_SEED = 7
+SPARSE_ROWS = 2000
+SEED = 0
+
+
+def repeated(dataset, times):
+    """The dataset with every row repeated times"""
+    return replace(
+        dataset,
+        packed=np.tile(dataset.packed, (times, 1)),
+        prognosis_codes=np.tile(dataset.prognosis_codes, times),
+        category_codes=np.tile(dataset.category_codes, times),
+    )
+
+
+def random_notes(n_symptoms, rows, rng):
+    """Notes naming 1-3 random symptoms"""
+    X = np.zeros((rows, n_symptoms), dtype=np.uint8)
+    for i in range(rows):
+        X[i, rng.choice(n_symptoms, rng.integers(1, 4), replace=False)] = 1
+    return X
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def compare(name, reference, other, X, labels=None):
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        ref, oth = reference.predict_proba(X), other.predict_proba(X)
+    agree = (ref.argmax(axis=1) == oth.argmax(axis=1)).mean()
+    line = f"  {name:<18}: agreement {agree:.1%}, mean |Δp| {np.abs(ref - oth).mean():.4f}"
+    if labels is not None:
+        line += f", accuracy {(other.classes_[oth.argmax(axis=1)] == labels).mean():.1%}"
+    return line
+
+
+# =========================
+# BENCHMARK
+# =========================
+if __name__ == "__main__":
+    scales = [int(s) for s in sys.argv[1:]] or SCALES
+    base = load_dataset()
+    test_data = load_dataset(TESTING_PATH)
+    X_test = test_data.matrix(base.columns)
+    X_notes = random_notes(len(base.columns), SPARSE_ROWS, np.random.default_rng(SEED))
+
+    print("🧮 DUPLICATE-COLLAPSING TRAINING")
+    print("--------------------------------")
+    for scale in scales:
+        dataset = repeated(base, scale)
+
+        def full(seed=RANDOM_STATE):
+            df = balanced_rows(dataset.frame(), random_state=seed)
+            X = df.drop(["prognosis", "category"], axis=1)
+            return fit_forest(X, df["category"], random_state=seed), X.memory_usage().sum()
+
+        def collapsed():
+            X, y, counts = balanced_distinct_rows(dataset)
+            return fit_forest(X, y, counts), X.memory_usage().sum(), len(X)
+
+        (reference, full_bytes), full_s = timed(full)
+        (refit, _), _ = timed(lambda: full(OTHER_SEED))
+        (model, collapsed_bytes, distinct), collapsed_s = timed(collapsed)
+
+        print(f"\n📋 Training.csv x{scale} ({len(dataset)} rows, {distinct} distinct after balancing)")
+        print(f"Full rows             : {full_s:.2f} s, training matrix {full_bytes / 1e6:.2f} MB")
+        print(f"Collapsed + weights   : {collapsed_s:.2f} s, training matrix {collapsed_bytes / 1e6:.2f} MB "
+              f"({full_s / collapsed_s:.1f}x faster)")
+        print(f"Against the full-row model (seed {RANDOM_STATE}):")
+        for label, other in ((f"refit, seed {OTHER_SEED}", refit), ("collapsed", model)):
+            print(f" {label}")
+            print(compare("Testing.csv", reference, other, X_test, test_data.category))
+            print(compare("1-3 symptom notes", reference, other, X_notes))
@@ -0,0 +1,109 @@
+import time
+import numpy as np
+
+from predict import Predictor
+from forest import EARLY_EXIT_FIRST_BLOCK
+from bench_forest import load_test_matrix
+
+# =========================
+# EARLY-EXIT SCORING BENCHMARK
+# =========================
+# Scores every Testing.csv row on its own, once through the full forest and
+# once with predict_proba_early, and reports the latency saved, how many
+# trees were walked and how often the category agrees. The same is done on
+# "sparse notes": the test rows with half their symptoms dropped, which is
+# closer to what free-text intake produces and gives far less clear-cut
+# margins. Last, the whole file is scored as one batch, where the walk is
+# bound by rows x trees rather than by per-step overhead and smaller blocks
+# pay off. One row per call is slower on sparse notes, which is why early
+# exit is only offered for batches.
+
+REPEATS = 30
+SINGLE_SCHEDULES = [(EARLY_EXIT_FIRST_BLOCK, None), (160, None), (240, None), (160, 20)]
+BATCH_SCHEDULES = [(EARLY_EXIT_FIRST_BLOCK, None), (160, 20), (150, 10)]
+SEED = 0
+
+
+def per_row_ms(fn, X, repeats=REPEATS):
+    """Best-of-repeats latency of fn on each row alone, in ms"""
+    times = []
+    for i in range(len(X)):
+        row = X[i:i + 1]
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn(row)
+            best = min(best, time.perf_counter() - start)
+        times.append(best * 1000)
+    return np.array(times)
+
+
+def drop_half(X, rng):
+    """Keep a random half (at least one) of each row's symptoms"""
+    out = np.zeros_like(X)
+    for i, row in enumerate(X):
+        present = np.flatnonzero(row)
+        keep = rng.choice(present, max(1, len(present) // 2), replace=False)
+        out[i, keep] = 1
+    return out
+
+
+def batch_ms(fn, X, repeats=REPEATS):
+    """Best-of-repeats latency of fn on all of X at once, in ms"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _saved(ms, base):
+    change = 1 - ms / base
+    return f"{change:.0%} saved" if change >= 0 else f"{-change:.0%} slower"
+
+
+def report(forest, name, X):
+    full = forest.predict_proba(X)
+    full_ms = per_row_ms(forest.predict_proba, X).mean()
+    full_batch_ms = batch_ms(forest.predict_proba, X)
+
+    print(f"\n📋 {name} ({len(X)} rows, {forest.n_trees} trees)")
+    print(f"Full, one row/call    : {full_ms:.3f} ms/row")
+    for mode, schedules in (("one row/call", SINGLE_SCHEDULES), ("whole batch", BATCH_SCHEDULES)):
+        for first_block, block in schedules:
+            probs, used = forest.predict_proba_early(X, first_block, block)
+            agree = (probs.argmax(axis=1) == full.argmax(axis=1)).mean()
+            conf_diff = np.abs(probs.max(axis=1) - full.max(axis=1)).max() * 100
+
+            def run(rows):
+                return forest.predict_proba_early(rows, first_block, block)
+
+            if mode == "whole batch":
+                ms, base = batch_ms(run, X), full_batch_ms
+            else:
+                ms, base = per_row_ms(run, X).mean(), full_ms
+
+            print(f"Early {first_block}+{block or 'rest'}, {mode:<12}: {ms:.3f} ms vs {base:.3f} full "
+                  f"({_saved(ms, base)}), trees {used.mean():.0f} avg, "
+                  f"{(used < forest.n_trees).mean():.0%} exited early, "
+                  f"agreement {agree:.1%}, max confidence shift {conf_diff:.2f} pts")
+
+
+# =========================
+# BENCHMARK
+# =========================
+if __name__ == "__main__":
+    predictor = Predictor(cache_size=0)
+    forest = predictor.forest
+    if forest is None:
+        raise SystemExit("❌ No flat forest for this model; run forest.py first")
+
+    X = (load_test_matrix(predictor.symptoms) != 0).astype(np.uint8)
+    sparse_notes = drop_half(X, np.random.default_rng(SEED))
+
+    print("⏱️ EARLY-EXIT FOREST SCORING")
+    print("--------------------------------")
+    report(forest, "Testing.csv", X)
+    report(forest, "Sparse notes (half the symptoms)", sparse_notes)
+
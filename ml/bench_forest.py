@@ -0,0 +1,106 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from predict import Predictor
+from forest import FlatForest
+from dataset import load_dataset, TESTING_PATH
+
+# =========================
+# BASE DIRECTORY
+# =========================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SINGLE_ROW_REPEATS = 200
+BATCH_ROWS = 20000
+
+
+def load_test_matrix(symptoms):
+    """Testing.csv symptom columns as a dense 0/1 matrix in symptoms.txt order"""
+    return load_dataset(TESTING_PATH).matrix(symptoms).astype(np.float64)
+
+
+def per_call(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+# =========================
+# BENCHMARK
+# =========================
+if __name__ == "__main__":
+    predictor = Predictor()
+    model = predictor.model
+
+    start = time.perf_counter()
+    forest = FlatForest.from_model(model)
+    export_ms = (time.perf_counter() - start) * 1000
+
+    print("🌲 FLATTENED FOREST")
+    print("--------------------------------")
+    print(f"Trees / nodes / depth : {forest.n_trees} / {forest.n_nodes} / {forest.max_depth}")
+    print(f"Export time           : {export_ms:.1f} ms")
+
+    X = load_test_matrix(predictor.symptoms)
+
+    # sklearn sees a DataFrame, as it does when scoring intake files
+    X_frame = pd.DataFrame(X, columns=predictor.symptoms)
+
+    # Exactness: sklearn with n_jobs=1 sums trees in estimator order, as we do
+    n_jobs = model.n_jobs
+    model.set_params(n_jobs=1)
+    sk_probs = model.predict_proba(X_frame)
+    model.set_params(n_jobs=n_jobs)
+    flat_probs = forest.predict_proba(X)
+
+    print(f"Bit-identical probs   : {np.array_equal(sk_probs, flat_probs)}")
+    print(f"Max abs difference    : {np.abs(sk_probs - flat_probs).max():.3e}")
+    print(f"Same top category     : {(sk_probs.argmax(1) == flat_probs.argmax(1)).mean() * 100:.2f}%")
+
+    # Single-row latency (what one registration pays)
+    row = X[:1]
+    row_frame = X_frame.iloc[:1]
+    sk_single = per_call(lambda: model.predict_proba(row_frame), SINGLE_ROW_REPEATS)
+    flat_single = per_call(lambda: forest.predict_proba(row), SINGLE_ROW_REPEATS)
+
+    print("\n⏱️ SINGLE ROW")
+    print("--------------------------------")
+    print(f"sklearn    : {sk_single * 1000:8.3f} ms")
+    print(f"flat       : {flat_single * 1000:8.3f} ms  ({sk_single / flat_single:.1f}x)")
+
+    # Batches: real intake repeats symptom combinations, random rows do not
+    rng = np.random.default_rng(42)
+    distinct = np.zeros((BATCH_ROWS, X.shape[1]))
+    for r in range(BATCH_ROWS):
+        distinct[r, rng.choice(X.shape[1], rng.integers(2, 7), replace=False)] = 1
+    batches = {
+        "repeated (Testing.csv tiled)": np.tile(X, (BATCH_ROWS // len(X) + 1, 1))[:BATCH_ROWS],
+        "distinct (random 2-6 symptoms)": distinct,
+    }
+
+    for name, batch in batches.items():
+        batch_frame = pd.DataFrame(batch, columns=predictor.symptoms)
+        sk_batch = per_call(lambda: model.predict_proba(batch_frame), 3)
+        flat_batch = per_call(lambda: forest.predict_proba(batch), 3)
+        pred_batch = per_call(lambda: predictor.predict_proba(batch), 3)
+
+        print(f"\n⏱️ {BATCH_ROWS} ROWS, {name}")
+        print("--------------------------------")
+        print(f"sklearn    : {sk_batch * 1000:8.1f} ms  ({BATCH_ROWS / sk_batch:,.0f} rows/s)")
+        print(f"flat       : {flat_batch * 1000:8.1f} ms  ({BATCH_ROWS / flat_batch:,.0f} rows/s, {sk_batch / flat_batch:.1f}x)")
+        print(f"Predictor  : {pred_batch * 1000:8.1f} ms  ({BATCH_ROWS / pred_batch:,.0f} rows/s, {sk_batch / pred_batch:.1f}x)")
+
+    # Sparse input: a patient has a handful of the symptoms
+    csr = sparse.csr_matrix(distinct.astype(np.uint8))
+    dense_bytes = distinct.nbytes / BATCH_ROWS
+    csr_bytes = (csr.data.nbytes + csr.indices.nbytes + csr.indptr.nbytes) / BATCH_ROWS
+    csr_batch = per_call(lambda: predictor.predict_proba(csr), 3)
+
+    print("\n🧮 SPARSE INPUT")
+    print("--------------------------------")
+    print(f"Bytes per row       : dense float64 {dense_bytes:.0f}, CSR {csr_bytes:.1f} ({dense_bytes / csr_bytes:.0f}x smaller)")
+    print(f"Predictor (CSR)     : {csr_batch * 1000:8.1f} ms  ({BATCH_ROWS / csr_batch:,.0f} rows/s)")
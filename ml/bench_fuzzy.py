@@ -0,0 +1,71 @@
+import time
+import random
+
+from predict import load_symptoms
+from symptom_parser import SymptomParser
+from fuzzy import MIN_FUZZY_LENGTH
+
+# =========================
+# SETTINGS
+# =========================
+NOTES = 2000
+FILLER = ["patient", "reports", "since", "yesterday", "with", "mild", "and",
+          "no", "history", "of", "complains", "severe", "at", "night"]
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def misspell(word, rng):
+    """One typical typo: dropped, doubled, swapped or wrong letter"""
+    if len(word) < MIN_FUZZY_LENGTH:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.randrange(4)
+    if kind == 0:
+        return word[:i] + word[i + 1:]
+    if kind == 1:
+        return word[:i] + word[i] + word[i:]
+    if kind == 2:
+        return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+    return word[:i] + rng.choice(LETTERS) + word[i + 1:]
+
+
+def make_notes(vocabulary, rng):
+    """(note, symptoms written in it) with one word per symptom misspelled"""
+    notes = []
+    for _ in range(NOTES):
+        symptoms = rng.sample(vocabulary, rng.randint(2, 5))
+        parts = [rng.choice(FILLER) for _ in range(10)]
+        for s in symptoms:
+            words = s.split("_")
+            j = max(range(len(words)), key=lambda k: len(words[k]))
+            words[j] = misspell(words[j], rng)
+            parts.insert(rng.randrange(len(parts) + 1), " ".join(words))
+        notes.append((" ".join(parts), set(symptoms)))
+    return notes
+
+
+def run(parser, notes):
+    """(recall, precision, seconds per note)"""
+    found = wrong = expected = 0
+    start = time.perf_counter()
+    for note, symptoms in notes:
+        detected = parser.scan(note).symptoms
+        found += len(detected & symptoms)
+        wrong += len(detected - symptoms)
+        expected += len(symptoms)
+    elapsed = (time.perf_counter() - start) / len(notes)
+    return found / expected, found / max(found + wrong, 1), elapsed
+
+
+# =========================
+# BENCHMARK
+# =========================
+if __name__ == "__main__":
+    vocabulary = load_symptoms()
+    notes = make_notes(vocabulary, random.Random(42))
+
+    print(f"\n⏱️ {NOTES} notes with misspelled symptoms")
+    print("--------------------------------")
+    for label, fuzzy in (("exact only", False), ("with fuzzy", True)):
+        recall, precision, elapsed = run(SymptomParser(vocabulary, fuzzy=fuzzy), notes)
+        print(f"{label} : recall {recall:6.1%}  precision {precision:6.1%}  {elapsed * 1e6:8.1f} us/note")
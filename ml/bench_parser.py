@@ -0,0 +1,59 @@
+import time
+import random
+
+from predict import load_symptoms
+from symptom_parser import SYMPTOM_ALIASES, SymptomParser
+
+# =========================
+# SETTINGS
+# =========================
+NOTES = 2000
+FILLER = ["patient", "reports", "since", "yesterday", "with", "mild", "and",
+          "no", "history", "of", "complains", "severe", "at", "night"]
+
+
+def substring_scan(text, vocabulary):
+    """The old per-phrase `in` loops, kept here as the baseline"""
+    text = text.lower()
+    detected = {c for p, c in SYMPTOM_ALIASES.items() if p in text}
+    detected |= {s for s in vocabulary if s.replace("_", " ") in text}
+    return detected
+
+
+def make_notes(vocabulary, words, rng):
+    phrases = list(SYMPTOM_ALIASES) + [s.replace("_", " ") for s in vocabulary]
+    notes = []
+    for _ in range(NOTES):
+        parts = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(rng.randint(2, 6)):
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(phrases))
+        notes.append(" ".join(parts))
+    return notes
+
+
+# =========================
+# BENCHMARK
+# =========================
+if __name__ == "__main__":
+    vocabulary = load_symptoms()
+    parser = SymptomParser(vocabulary, fuzzy=False)  # exact matching, like the baseline
+    rng = random.Random(42)
+
+    print(f"🔎 {len(SYMPTOM_ALIASES) + len(vocabulary)} phrases, {parser.matcher.n_states} automaton states")
+    for words in (10, 100, 1000):
+        notes = make_notes(vocabulary, words, rng)
+
+        start = time.perf_counter()
+        for note in notes:
+            substring_scan(note, vocabulary)
+        old = (time.perf_counter() - start) / len(notes)
+
+        start = time.perf_counter()
+        for note in notes:
+            parser.scan(note)
+        new = (time.perf_counter() - start) / len(notes)
+
+        print(f"\n⏱️ ~{words}-word notes")
+        print("--------------------------------")
+        print(f"substring loops : {old * 1e6:9.1f} us/note")
+        print(f"PhraseMatcher   : {new * 1e6:9.1f} us/note  ({old / new:.1f}x)")
@@ -0,0 +1,50 @@
+import os
+import time
+import numpy as np
+from scipy import sparse
+
+from predict import Predictor
+from pool import PoolScorer
+
+# =========================
+# SETTINGS
+# =========================
+BATCH_ROWS = 200000
+
+
+def random_patients(n_rows, n_symptoms, seed=42):
+    """CSR batch of patients with 2-6 random symptoms each"""
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(2, 7, n_rows)
+    indptr = np.concatenate([[0], np.cumsum(counts)])
+    indices = np.concatenate([rng.choice(n_symptoms, k, replace=False) for k in counts])
+    data = np.ones(len(indices), dtype=np.uint8)
+    return sparse.csr_matrix((data, indices, indptr), shape=(n_rows, n_symptoms))
+
+
+# =========================
+# BENCHMARK
+# =========================
+if __name__ == "__main__":
+    predictor = Predictor(cache_size=0)
+    X = random_patients(BATCH_ROWS, len(predictor.symptoms))
+    predictor.predict_proba(X[:1000])  # unpickle model.pkl outside the timings
+
+    start = time.perf_counter()
+    expected = predictor.predict_proba(X)
+    single = time.perf_counter() - start
+
+    print(f"🧵 {BATCH_ROWS} patients, {os.cpu_count()} CPU(s)")
+    print("--------------------------------")
+    print(f"In-process   : {BATCH_ROWS / single:10,.0f} rows/s")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        with PoolScorer(workers, predictor=predictor) as scorer:
+            start = time.perf_counter()
+            probs = scorer.predict_proba(X)
+            elapsed = time.perf_counter() - start
+        same = np.allclose(probs, expected, rtol=0, atol=1e-12)
+        print(f"{workers:2d} worker(s) : {BATCH_ROWS / elapsed:10,.0f} rows/s  "
+              f"({single / elapsed:.2f}x, same results: {same})")
+        workers *= 2
@@ -0,0 +1,53 @@
+import time
+import numpy as np
+
+from predict import load_symptoms
+from forest import pack_rows
+from rules import get_engine, normalise_phrase
+
+# =========================
+# SETTINGS
+# =========================
+ROWS = 1_000_000
+SYMPTOM_RATE = 0.03  # chance of each symptom being present
+
+
+def python_check(rules, row_symptoms):
+    """Per-row set counting, the way the overrides used to be decided"""
+    for rule in rules:
+        if len(set(rule.triggers) & row_symptoms) >= rule.threshold:
+            return rule
+    return None
+
+
+# =========================
+# BENCHMARK
+# =========================
+if __name__ == "__main__":
+    vocabulary = load_symptoms()
+    engine = get_engine(tuple(vocabulary))
+    rng = np.random.default_rng(42)
+    X = (rng.random((ROWS, len(vocabulary))) < SYMPTOM_RATE).view(np.uint8)
+    packed = pack_rows(X)
+
+    sample = 20000
+    start = time.perf_counter()
+    names = np.asarray([normalise_phrase(s) for s in vocabulary])
+    for row in X[:sample]:
+        python_check(engine.rules, set(names[np.flatnonzero(row)]))
+    loop = (time.perf_counter() - start) / sample
+
+    start = time.perf_counter()
+    fired = engine.apply_packed(packed)
+    packed_time = (time.perf_counter() - start) / ROWS
+
+    start = time.perf_counter()
+    engine.apply(X)
+    dense_time = (time.perf_counter() - start) / ROWS
+
+    print(f"\n⏱️ {len(engine.rules)} override rules over {ROWS:,} rows "
+          f"({(fired >= 0).mean():.2%} fire)")
+    print("--------------------------------")
+    print(f"python loop       : {loop * 1e9:9.0f} ns/row")
+    print(f"bitmask (packed)  : {packed_time * 1e9:9.0f} ns/row  ({loop / packed_time:.0f}x)")
+    print(f"bitmask (0/1 rows): {dense_time * 1e9:9.0f} ns/row")
@@ -0,0 +1,70 @@
+import json
+import time
+import random
+import asyncio
+
+from predict import Predictor
+from server import InferenceServer, BATCH_WINDOW_MS, MAX_BATCH_SIZE
+
+# =========================
+# SETTINGS
+# =========================
+CLIENTS = 32
+REQUESTS_PER_CLIENT = 50
+
+
+async def client(port, patients):
+    """One reception desk: sequential requests over a keep-alive connection"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for symptoms in patients:
+        body = json.dumps({"symptoms": symptoms}).encode()
+        writer.write(
+            b"POST /predict HTTP/1.1\r\nHost: localhost\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        status = await reader.readline()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        assert status.startswith(b"HTTP/1.1 200"), status
+    writer.close()
+
+
+async def run(predictor, max_batch, workload):
+    server = await InferenceServer(predictor, BATCH_WINDOW_MS, max_batch).start(port=0)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(server.port, patients) for patients in workload))
+    elapsed = time.perf_counter() - start
+    stats = server.batcher.stats_dict()
+    await server.close()
+    return elapsed, stats
+
+
+# =========================
+# BENCHMARK
+# =========================
+if __name__ == "__main__":
+    # No prediction cache: measure the batching, not repeat hits
+    predictor = Predictor(cache_size=0)
+    rng = random.Random(42)
+    workload = [
+        [rng.sample(predictor.symptoms, rng.randint(2, 6)) for _ in range(REQUESTS_PER_CLIENT)]
+        for _ in range(CLIENTS)
+    ]
+    total = CLIENTS * REQUESTS_PER_CLIENT
+
+    print(f"🏥 {CLIENTS} concurrent clients x {REQUESTS_PER_CLIENT} requests")
+    for max_batch in (1, MAX_BATCH_SIZE):
+        elapsed, stats = asyncio.run(run(predictor, max_batch, workload))
+        print(f"\n⏱️ max batch {max_batch}")
+        print("--------------------------------")
+        print(f"Throughput      : {total / elapsed:,.0f} req/s")
+        print(f"Mean batch size : {stats['mean_batch_size']:.1f}")
+        print(f"Max queue depth : {stats['max_queue_depth']}")
+        print(f"Latency p50/p99 : {stats['latency_ms']['p50']:.2f} / {stats['latency_ms']['p99']:.2f} ms")
@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+
+# =========================
+# PREDICTION CACHE
+# =========================
+# Intake traffic repeats a small set of symptom combinations. Keys are the
+# packed symptom bitset of a patient (bytes), so the same combination always
+# hits no matter how it was typed or ordered. Every cache is tagged with the
+# content hash of the model that filled it and belongs to one Predictor: a
+# reloaded model comes with a new Predictor and so an empty cache.
+
+PREDICTION_CACHE_SIZE = 4096
+
+
+class PredictionCache:
+    """Thread-safe bounded LRU map from symptom bitset to class probabilities"""
+
+    def __init__(self, capacity=PREDICTION_CACHE_SIZE, tag=None):
+        if capacity < 0:
+            raise ValueError("capacity must be >= 0")
+        self.capacity = capacity
+        self.tag = tag
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Cached value for key (marking it most recently used), or None"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.capacity == 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tag": self.tag,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
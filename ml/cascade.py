@@ -0,0 +1,110 @@
+import os
+import json
+import numpy as np
+
+# =========================
+# TWO-STAGE CASCADE
+# =========================
+# Most intake rows are easy: a Bernoulli naive Bayes model over the 0/1
+# symptom columns names the same category as the forest, at the cost of one
+# (rows x symptoms) @ (symptoms x categories) matrix product. In a cascade
+# every row is scored by that first stage, and only rows whose first-stage
+# confidence is below a threshold are escalated to the forest.
+#
+# The stage is fitted next to the forest by train_model.py and saved as one
+# .npz tagged with the model.pkl it was trained with. tune_cascade.py picks
+# the threshold from the accuracy/throughput curve on Testing.csv and
+# stores it in the same file.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CASCADE_PATH = os.path.join(BASE_DIR, "model_stage1.npz")
+
+# First-stage confidence (0-1) at or above which the forest is skipped,
+# until tune_cascade.py has stored a tuned one
+CASCADE_THRESHOLD = 0.99
+
+# Laplace smoothing of the per-category symptom frequencies
+NB_ALPHA = 1.0
+
+
+class NaiveBayesStage:
+    """Bernoulli naive Bayes over 0/1 symptom columns, scored with one matrix product.
+
+    log P(category | x) = x @ weights + bias (up to a per-row constant),
+    where weights[j, c] = log p(j | c) - log(1 - p(j | c)) and bias[c] is
+    the log prior plus the sum of log(1 - p(j | c)) over all symptoms.
+    """
+
+    def __init__(self, weights, bias, classes, threshold=CASCADE_THRESHOLD, source_hash=None):
+        self.weights = weights
+        self.bias = bias
+        self.classes_ = classes
+        self.threshold = float(threshold)
+        self.source_hash = source_hash
+
+    @classmethod
+    def fit(cls, X, y, alpha=NB_ALPHA, sample_weight=None, threshold=CASCADE_THRESHOLD):
+        """Fit on a (rows, symptoms) 0/1 matrix and its category labels"""
+        X = (np.asarray(X) != 0).astype(np.float64)
+        classes, y_index = np.unique(np.asarray(y), return_inverse=True)
+        w = np.ones(len(X)) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+
+        # Weighted one-hot of the labels: counts[c] and present[c, j]
+        onehot = np.zeros((len(X), len(classes)))
+        onehot[np.arange(len(X)), y_index] = w
+        counts = onehot.sum(axis=0)
+        present = onehot.T @ X
+
+        p = (present + alpha) / (counts[:, None] + 2 * alpha)
+        log_p, log_not_p = np.log(p), np.log1p(-p)
+        prior = np.log(counts / counts.sum())
+
+        weights = np.ascontiguousarray((log_p - log_not_p).T)
+        bias = prior + log_not_p.sum(axis=1)
+        return cls(weights, bias, classes.astype(object), threshold)
+
+    def predict_proba(self, X):
+        """Class probabilities for a dense 0/1 matrix or CSR matrix"""
+        if not hasattr(X, "tocsr"):
+            X = (np.asarray(X) != 0).view(np.uint8)
+        jll = np.asarray(X @ self.weights) + self.bias
+        jll -= jll.max(axis=1, keepdims=True)
+        np.exp(jll, out=jll)
+        jll /= jll.sum(axis=1, keepdims=True)
+        return jll
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def save(self, path=CASCADE_PATH, source_hash=None):
+        """Write the stage; source_hash records the model.pkl it goes with"""
+        if source_hash is not None:
+            self.source_hash = source_hash
+        header = {"threshold": self.threshold, "source_sha256": self.source_hash,
+                  "classes": [str(c) for c in self.classes_]}
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, weights=self.weights, bias=self.bias, header=json.dumps(header))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=CASCADE_PATH):
+        with np.load(path) as f:
+            header = json.loads(str(f["header"]))
+            return cls(f["weights"], f["bias"], np.asarray(header["classes"], dtype=object),
+                       header["threshold"], header.get("source_sha256"))
+
+
+def cascade_proba(stage, forest_proba, X, threshold=None):
+    """Score X with the first stage and rows it is unsure of with forest_proba.
+
+    Returns (probs, escalated): escalated marks the rows whose probabilities
+    came from the forest.
+    """
+    if threshold is None:
+        threshold = stage.threshold
+    probs = stage.predict_proba(X)
+    escalated = probs.max(axis=1) < threshold
+    rows = np.flatnonzero(escalated)
+    if len(rows):
+        probs[rows] = forest_proba(X[rows])
+    return probs, escalated
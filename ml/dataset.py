@@ -0,0 +1,333 @@
+import os
+import sys
+import gzip
+import json
+import hashlib
+import zipfile
+import numpy as np
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+# =========================
+# CACHED FEATURE STORE
+# =========================
+# train_model.py and test_model.py both need a Dataset CSV as a clean 0/1
+# symptom matrix plus prognosis and category labels. Parsing the CSV and
+# running the column-cleaning chain costs far more than the data is worth:
+# Training.csv is 4,920 rows x 132 bits.
+#
+# load_dataset() does that work once and keeps the result in
+# ml/dataset_cache/<name>.npz:
+#   packed     symptom columns, np.packbits along each row
+#   prognosis  codes into a vocabulary of disease names
+#   category   codes into a vocabulary of categories
+# The cache records a fingerprint of the source CSV, the disease → category
+# map and the cleaning rules below. Any change to one of them rebuilds it.
+#
+# A source may also be compressed: "corpus.csv.gz", or a member of a zip
+# archive written "Dataset/archive.zip::Training.csv" (the member can be
+# left out when the archive holds a single CSV). Sources are read in
+# READ_CHUNK_ROWS-row chunks straight from the decompressing stream, so
+# nothing is extracted to disk and only one chunk is ever held as text.
+#
+# pandas is only imported when a cache has to be (re)built.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_DIR = os.path.join(BASE_DIR, "..", "Dataset")
+TRAINING_PATH = os.path.join(DATASET_DIR, "Training.csv")
+TESTING_PATH = os.path.join(DATASET_DIR, "Testing.csv")
+CATEGORY_MAP_PATH = os.path.join(BASE_DIR, "disease_category_map.csv")
+CACHE_DIR = os.path.join(BASE_DIR, "dataset_cache")
+
+# Column cleaning, in order: (pattern, replacement, regex)
+COLUMN_RULES = (
+    (" ", "_", False),
+    ("__+", "_", True),
+    (".", "", False),
+)
+# Cleaned columns matching these are dropped (index junk, pandas' ".1"
+# suffixes for duplicated headers)
+DROP_COLUMNS = ("^unnamed", r"\d+$")
+LABEL_COLUMN = "prognosis"
+DEFAULT_CATEGORY = "General"
+
+CACHE_FORMAT_VERSION = 1
+
+ARCHIVE_MEMBER_SEP = "::"
+READ_CHUNK_ROWS = 50000
+
+
+# =========================
+# SOURCES
+# =========================
+def split_source(source):
+    """(path, zip member or None) of a source spelled path or path.zip::member"""
+    path, sep, member = source.partition(ARCHIVE_MEMBER_SEP)
+    return path, (member if sep else None)
+
+
+def _zip_member(archive, member):
+    if member is not None:
+        return member
+    csvs = [name for name in archive.namelist() if name.lower().endswith(".csv")]
+    if len(csvs) != 1:
+        raise ValueError(f"{archive.filename} holds {len(csvs)} CSV files {csvs}; "
+                         f"name one as {archive.filename}{ARCHIVE_MEMBER_SEP}<member>")
+    return csvs[0]
+
+
+@contextmanager
+def open_source(source):
+    """Binary stream of a plain, gzip or zip-member CSV, decompressed on the fly"""
+    path, member = split_source(source)
+    lower = path.lower()
+    if lower.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive, archive.open(_zip_member(archive, member)) as stream:
+            yield stream
+        return
+    if member is not None:
+        raise ValueError(f"{path} is not a zip archive")
+    opener = gzip.open if lower.endswith((".gz", ".gzip")) else open
+    with opener(path, "rb") as stream:
+        yield stream
+
+
+def iter_frames(source, map_path=CATEGORY_MAP_PATH, chunk_size=READ_CHUNK_ROWS):
+    """Cleaned chunks of a source: symptom columns, prognosis and category"""
+    import pandas as pd
+    disease_to_category = load_category_map(map_path)
+    with open_source(source) as stream:
+        for chunk in pd.read_csv(stream, chunksize=chunk_size):
+            yield clean_frame(chunk, disease_to_category)
+
+
+# =========================
+# CLEANING
+# =========================
+def clean_columns(columns):
+    """Lowercase, underscore-separated symptom names, as the model was trained on"""
+    columns = columns.str.strip().str.lower()
+    for pattern, replacement, regex in COLUMN_RULES:
+        columns = columns.str.replace(pattern, replacement, regex=regex)
+    return columns
+
+
+def load_category_map(path=CATEGORY_MAP_PATH):
+    """Normalised disease name → category"""
+    import pandas as pd
+    map_df = pd.read_csv(path)
+    return dict(zip(map_df["disease"].str.strip().str.lower(),
+                    map_df["category"].str.strip()))
+
+
+def map_categories(prognosis, disease_to_category):
+    """Category for each prognosis; unmapped diseases are General"""
+    return prognosis.str.strip().str.lower().map(disease_to_category).fillna(DEFAULT_CATEGORY)
+
+
+def clean_frame(df, disease_to_category):
+    """Apply the column cleaning and add the category column to a raw Dataset frame"""
+    df.columns = clean_columns(df.columns)
+    for pattern in DROP_COLUMNS:
+        df = df.loc[:, ~df.columns.str.contains(pattern, regex=True)]
+    df["category"] = map_categories(df[LABEL_COLUMN], disease_to_category)
+    return df
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(source, map_path=CATEGORY_MAP_PATH):
+    """What a cache of source depends on: both input files and the cleaning rules"""
+    path, member = split_source(source)
+    rules = json.dumps([CACHE_FORMAT_VERSION, COLUMN_RULES, DROP_COLUMNS, LABEL_COLUMN, DEFAULT_CATEGORY])
+    return {
+        "source_sha256": _file_digest(path),
+        "member": member,
+        "category_map_sha256": _file_digest(map_path),
+        "rules_sha256": hashlib.sha256(rules.encode()).hexdigest(),
+    }
+
+
+@dataclass
+class Dataset:
+    """A cleaned Dataset CSV: bit-packed symptoms and dictionary-encoded labels"""
+    columns: list  # symptom names, in CSV order
+    packed: np.ndarray  # uint8 (rows, ceil(len(columns) / 8))
+    prognosis_codes: np.ndarray
+    prognosis_names: np.ndarray
+    category_codes: np.ndarray
+    category_names: np.ndarray
+
+    def __len__(self):
+        return len(self.packed)
+
+    @property
+    def X(self):
+        """Dense 0/1 uint8 symptom matrix"""
+        return np.unpackbits(self.packed, axis=1, count=len(self.columns))
+
+    @property
+    def prognosis(self):
+        return self.prognosis_names[self.prognosis_codes]
+
+    @property
+    def category(self):
+        return self.category_names[self.category_codes]
+
+    def frame(self):
+        """The cleaned DataFrame: symptom columns, then prognosis and category"""
+        import pandas as pd
+        df = pd.DataFrame(self.X, columns=self.columns)
+        df[LABEL_COLUMN] = self.prognosis
+        df["category"] = self.category
+        return df
+
+    def matrix(self, symptoms):
+        """Symptom matrix with columns in the given order; unknown symptoms are 0"""
+        index = {s: i for i, s in enumerate(self.columns)}
+        X = self.X
+        out = np.zeros((len(X), len(symptoms)), dtype=np.uint8)
+        cols = [(j, index[s]) for j, s in enumerate(symptoms) if s in index]
+        if cols:
+            dst, src = map(list, zip(*cols))
+            out[:, dst] = X[:, src]
+        return out
+
+    def distinct_rows(self):
+        """First index and number of occurrences of every distinct (symptoms, category) row.
+
+        Rows are compared on their packed bits plus category code, so this
+        costs one np.unique over ~20-byte keys. Order follows the keys, not
+        the file.
+        """
+        codes = self.category_codes.astype("<i4").reshape(-1, 1).view(np.uint8)
+        keys = np.ascontiguousarray(np.hstack([self.packed, codes]))
+        keys = keys.view(np.dtype((np.void, keys.shape[1]))).ravel()
+        _, first, counts = np.unique(keys, return_index=True, return_counts=True)
+        return first, counts
+
+    def save(self, path, source_fingerprint):
+        header = dict(source_fingerprint, columns=self.columns,
+                      prognosis_names=[str(n) for n in self.prognosis_names],
+                      category_names=[str(n) for n in self.category_names])
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, packed=self.packed, prognosis_codes=self.prognosis_codes,
+                 category_codes=self.category_codes, header=json.dumps(header))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Returns (dataset, header)"""
+        with np.load(path) as f:
+            header = json.loads(str(f["header"]))
+            dataset = cls(
+                columns=header["columns"],
+                packed=f["packed"],
+                prognosis_codes=f["prognosis_codes"],
+                prognosis_names=np.asarray(header["prognosis_names"], dtype=object),
+                category_codes=f["category_codes"],
+                category_names=np.asarray(header["category_names"], dtype=object),
+            )
+        return dataset, header
+
+
+def cache_path(source, cache_dir=CACHE_DIR):
+    """Cache file of a source: <name>.npz, or <archive>_<member>.npz"""
+    path, member = split_source(source)
+    name = os.path.basename(path)
+    for suffix in (".gz", ".gzip", ".zip", ".csv"):
+        if name.lower().endswith(suffix):
+            name = name[:-len(suffix)]
+    if member is not None:
+        name += "_" + os.path.splitext(os.path.basename(member))[0]
+    return os.path.join(cache_dir, name + ".npz")
+
+
+def _encode(values, vocabulary):
+    """Codes of values in a growing vocabulary {name: code}"""
+    names, inverse = np.unique(values.astype(str), return_inverse=True)
+    codes = np.array([vocabulary.setdefault(n, len(vocabulary)) for n in names], dtype=np.int32)
+    return codes[inverse]
+
+
+def _sorted_vocabulary(codes, vocabulary):
+    """Renumber codes so the vocabulary is in sorted order, as np.unique gives it"""
+    names = sorted(vocabulary)
+    remap = np.empty(len(names), dtype=np.int32)
+    remap[[vocabulary[n] for n in names]] = np.arange(len(names), dtype=np.int32)
+    return remap[codes], np.asarray(names, dtype=object)
+
+
+def build_dataset(source, map_path=CATEGORY_MAP_PATH, chunk_size=READ_CHUNK_ROWS):
+    """Parse and clean a source chunk by chunk, skipping the cache.
+
+    Only the bit-packed rows and label codes of chunks already read are
+    kept, so a corpus far larger than memory as text can be built.
+    """
+    columns = None
+    packed, prognosis, category = [], [], []
+    prognosis_vocab, category_vocab = {}, {}
+    for frame in iter_frames(source, map_path, chunk_size):
+        names = [c for c in frame.columns if c not in (LABEL_COLUMN, "category")]
+        if columns is None:
+            columns = names
+        features = frame[columns].to_numpy()
+        if ((features != 0) & (features != 1)).any():
+            raise ValueError("symptom columns must be 0/1")
+        packed.append(np.packbits(features.astype(np.uint8), axis=1))
+        prognosis.append(_encode(frame[LABEL_COLUMN].to_numpy(), prognosis_vocab))
+        category.append(_encode(frame["category"].to_numpy(), category_vocab))
+
+    if columns is None:
+        raise ValueError(f"{source} has no rows")
+    prognosis_codes, prognosis_names = _sorted_vocabulary(np.concatenate(prognosis), prognosis_vocab)
+    category_codes, category_names = _sorted_vocabulary(np.concatenate(category), category_vocab)
+    return Dataset(
+        columns=columns,
+        packed=np.concatenate(packed),
+        prognosis_codes=prognosis_codes,
+        prognosis_names=prognosis_names,
+        category_codes=category_codes,
+        category_names=category_names,
+    )
+
+
+def load_dataset(source=TRAINING_PATH, map_path=CATEGORY_MAP_PATH, cache_dir=CACHE_DIR, rebuild=False):
+    """A cleaned Dataset CSV (plain, .gz or zip member), from the cache when it is still current"""
+    expected = fingerprint(source, map_path)
+    target = cache_path(source, cache_dir)
+    if not rebuild:
+        try:
+            dataset, header = Dataset.load(target)
+            if all(header.get(k) == v for k, v in expected.items()):
+                return dataset
+        except (OSError, ValueError, KeyError):
+            pass
+
+    dataset = build_dataset(source, map_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    dataset.save(target, expected)
+    return dataset
+
+
+# =========================
+# BUILD / REFRESH CACHES
+# =========================
+if __name__ == "__main__":
+    import time
+    sources = sys.argv[1:] or [TRAINING_PATH, TESTING_PATH]
+    for source in sources:
+        start = time.perf_counter()
+        dataset = load_dataset(source, rebuild=True)
+        built_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        load_dataset(source)
+        cached_ms = (time.perf_counter() - start) * 1000
+        print(f"📦 {os.path.basename(source)}: {len(dataset)} rows x {len(dataset.columns)} symptoms, "
+              f"built in {built_ms:.0f} ms, cached load {cached_ms:.1f} ms")
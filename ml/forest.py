@@ -0,0 +1,318 @@
+import os
+import sys
+import json
+import numpy as np
+
+# =========================
+# FLATTENED RANDOM FOREST
+# =========================
+# sklearn evaluates a RandomForestClassifier tree by tree through its generic
+# predict_proba (input validation, joblib dispatch, one Cython call per tree).
+# Every symptom column is 0/1, so each split is just "symptom present?".
+# FlatForest stores all trees in a handful of contiguous node arrays and walks
+# every tree for every row at once with NumPy fancy indexing.
+#
+# The walk costs rows x trees x depth gathers, so it beats sklearn's compiled
+# per-tree loop on small batches only; callers should collapse repeated rows
+# with unique_rows() first and hand very large batches to sklearn.
+#
+# Inputs may be dense 0/1 arrays or SciPy CSR matrices. Sparse batches are
+# only expanded EVAL_CHUNK_ROWS rows at a time, right before the walk. SciPy
+# itself is never imported here, so dense scoring needs nothing but NumPy.
+
+EVAL_CHUNK_ROWS = 512
+
+# Anytime scoring of batches (predict_proba_early): trees walked before the
+# margin check. No row can be settled before half the trees; every
+# Testing.csv row is by 190 (see bench_early_exit.py).
+EARLY_EXIT_FIRST_BLOCK = 200
+
+# =========================
+# ON-DISK LAYOUT
+# =========================
+# A flat model is a directory of raw .npy arrays plus header.json. Loading
+# memory-maps the arrays, so it is near-instant and every process scoring
+# with the same directory shares one copy of the pages.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FLAT_MODEL_DIR = os.path.join(BASE_DIR, "model_flat")
+FLAT_FORMAT_VERSION = 1
+FLAT_ARRAYS = ("feature", "children", "value", "roots")
+
+
+def issparse(X):
+    """scipy.sparse.issparse without importing SciPy.
+
+    Nothing can be a sparse matrix before scipy.sparse has been imported.
+    """
+    sp = sys.modules.get("scipy.sparse")
+    return sp is not None and sp.issparse(X)
+
+
+class FlatForest:
+    """All trees of a fitted forest packed into contiguous node arrays.
+
+    feature[n]      symptom column tested at node n (0 at leaves)
+    children[n]     global index of the child taken when the symptom is
+                    absent (column 0) or present (column 1); leaves point
+                    at themselves
+    value[n]        class distribution at node n, exactly what sklearn's
+                    DecisionTreeClassifier.predict_proba returns for it
+    roots[t]        global index of tree t's root
+    """
+
+    def __init__(self, feature, children, value, roots, max_depth, classes):
+        self.feature = feature
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_model(cls, model):
+        """Export a fitted RandomForestClassifier trained on 0/1 features"""
+        features, children, values, roots = [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for est in model.estimators_:
+            tree = est.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left < 0
+            threshold = tree.threshold[~is_leaf]
+            if len(threshold) and (threshold.min() < 0 or threshold.max() >= 1):
+                raise ValueError("FlatForest only supports splits on 0/1 features")
+
+            own = np.arange(offset, offset + n)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            children.append(np.stack([
+                np.where(is_leaf, own, tree.children_left + offset),
+                np.where(is_leaf, own, tree.children_right + offset),
+            ], axis=1))
+
+            # sklearn >= 1.4 already stores class fractions in tree_.value and
+            # returns them untouched; older releases stored weighted counts
+            # and normalised at predict time.
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            if not np.allclose(normalizer[normalizer > 0], 1.0):
+                normalizer[normalizer == 0.0] = 1.0
+                value = value / normalizer
+            values.append(value)
+
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.int16),
+            children=np.ascontiguousarray(np.concatenate(children), dtype=np.int32),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            classes=np.asarray(model.classes_),
+        )
+
+    def save(self, path, source_hash=None):
+        """Write the forest as a flat model directory.
+
+        source_hash records which model.pkl it was exported from, so a
+        stale export can be told apart from a fresh one. header.json is
+        written last: a directory without it is incomplete.
+        """
+        os.makedirs(path, exist_ok=True)
+        header_path = os.path.join(path, "header.json")
+        if os.path.exists(header_path):
+            os.remove(header_path)
+
+        # Running Predictors have the old arrays memory-mapped: each file is
+        # replaced by a new one rather than rewritten, so their mappings keep
+        # the old pages until they reload
+        for name in FLAT_ARRAYS:
+            array_path = os.path.join(path, name + ".npy")
+            with open(array_path + ".tmp", "wb") as f:
+                np.save(f, getattr(self, name))
+            os.replace(array_path + ".tmp", array_path)
+
+        header = {
+            "format_version": FLAT_FORMAT_VERSION,
+            "source_sha256": source_hash,
+            "n_trees": self.n_trees,
+            "n_nodes": self.n_nodes,
+            "max_depth": self.max_depth,
+            "classes": [str(c) for c in self.classes_],
+            "arrays": {
+                name: {"dtype": str(getattr(self, name).dtype),
+                       "shape": list(getattr(self, name).shape)}
+                for name in FLAT_ARRAYS
+            },
+        }
+        tmp_path = header_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(header, f, indent=2)
+        os.replace(tmp_path, header_path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Open a flat model directory; returns (forest, header)"""
+        with open(os.path.join(path, "header.json")) as f:
+            header = json.load(f)
+        if header.get("format_version") != FLAT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported flat model format: {header.get('format_version')}")
+
+        arrays = {}
+        for name in FLAT_ARRAYS:
+            # np.asarray drops the memmap subclass (slow to index) but keeps
+            # the mapped buffer
+            arrays[name] = np.asarray(np.load(os.path.join(path, name + ".npy"),
+                                              mmap_mode="r" if mmap else None))
+            expected = header["arrays"][name]
+            if list(arrays[name].shape) != expected["shape"] or str(arrays[name].dtype) != expected["dtype"]:
+                raise ValueError(f"{name}.npy does not match header.json")
+
+        forest = cls(max_depth=header["max_depth"],
+                     classes=np.asarray(header["classes"], dtype=object), **arrays)
+        return forest, header
+
+    def leaves(self, X, roots=None):
+        """Leaf reached in every tree for every row of a 0/1 uint8 matrix.
+
+        roots limits the walk to some trees (default: all). Returns global
+        node indices of shape (rows, trees).
+        """
+        if roots is None:
+            roots = self.roots
+        X = np.ascontiguousarray(X, dtype=np.uint8)
+        flat = X.ravel()
+        step = self.children.ravel()
+        base = (np.arange(len(X), dtype=np.int32) * X.shape[1])[:, None]
+        node = np.broadcast_to(roots, (len(X), len(roots)))
+        for _ in range(self.max_depth):
+            present = flat[base + self.feature[node]]
+            node = step[2 * node + present]
+        return node
+
+    def predict_proba(self, X):
+        """Mean leaf distribution over all trees, matching sklearn's output.
+
+        Trees are summed in estimator order and divided by the tree count,
+        the same arithmetic RandomForestClassifier.predict_proba performs.
+        """
+        is_sparse = issparse(X)
+        if not is_sparse:
+            X = (np.asarray(X) != 0).view(np.uint8)
+
+        out = np.empty((X.shape[0], self.value.shape[1]))
+        for start in range(0, X.shape[0], EVAL_CHUNK_ROWS):
+            chunk = X[start:start + EVAL_CHUNK_ROWS]
+            if is_sparse:
+                chunk = chunk.toarray() != 0
+            out[start:start + len(chunk)] = self.value[self.leaves(chunk)].sum(axis=1)
+        out /= self.n_trees
+        return out
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def predict_proba_early(self, X, first_block=EARLY_EXIT_FIRST_BLOCK, block=None):
+        """Anytime predict_proba: stop adding trees once the winner is settled.
+
+        Trees are walked in estimator order, first_block trees and then
+        block trees at a time (default: all the rest). Every tree adds a
+        distribution summing to 1, so once the leading class is ahead of the
+        runner-up by more than the number of trees left, no outcome of those
+        trees can change the argmax and the row stops there.
+
+        A walk costs max_depth NumPy steps however few trees it covers, so
+        for a single row every extra block costs about as much as a full
+        evaluation and a row that is not settled after first_block ends up
+        slower than predict_proba. This is for batches of many rows only;
+        single patients are scored on the full forest.
+
+        Returns (probs, trees_used): probs are the mean over the trees
+        actually used, so the top category always matches predict_proba
+        while its confidence is an estimate for rows that stopped early.
+        """
+        if issparse(X):
+            X = X.toarray()
+        X = (np.asarray(X) != 0).view(np.uint8)
+
+        sums = np.zeros((X.shape[0], self.value.shape[1]))
+        trees_used = np.zeros(X.shape[0], dtype=np.int32)
+        active = np.arange(X.shape[0])
+        start, stop = 0, min(self.n_trees, first_block)
+        while True:
+            rows = X if len(active) == len(X) else X[active]
+            sums[active] += self.value[self.leaves(rows, self.roots[start:stop])].sum(axis=1)
+            trees_used[active] = stop
+            remaining = self.n_trees - stop
+            if not remaining:
+                break
+
+            top2 = np.sort(sums[active], axis=1)[:, -2:]
+            active = active[top2[:, -1] - top2[:, 0] <= remaining]
+            if not len(active):
+                break
+            start, stop = stop, stop + min(remaining, block or remaining)
+
+        return sums / trees_used[:, None], trees_used
+
+
+def pack_rows(X):
+    """Bit-pack each row of a 0/1 dense array or CSR matrix.
+
+    Returns uint8 of shape (rows, ceil(n_features / 8)), the same layout as
+    np.packbits(X, axis=1). CSR input is packed without being densified.
+    """
+    if issparse(X):
+        X = X.tocsr()
+        X.eliminate_zeros()
+        packed = np.zeros((X.shape[0], (X.shape[1] + 7) // 8), dtype=np.uint8)
+        rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+        cols = X.indices
+        np.bitwise_or.at(packed, (rows, cols >> 3), (0x80 >> (cols & 7)).astype(np.uint8))
+        return packed
+    return np.packbits(np.asarray(X) != 0, axis=1)
+
+
+def unique_rows(X):
+    """Distinct rows of a 0/1 matrix and the map back to the originals.
+
+    Rows are compared on their packed bits, which is far cheaper than
+    np.unique(axis=0) on the full-width matrix. Dense input comes back as a
+    uint8 array, CSR input as CSR. Returns (X, None) when there is nothing
+    to collapse.
+    """
+    if not issparse(X):
+        X = (np.asarray(X) != 0).view(np.uint8)
+    if X.shape[0] < 2:
+        return X, None
+    packed = np.ascontiguousarray(pack_rows(X))
+    keys = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    if len(first) == X.shape[0]:
+        return X, None
+    return X[first], inverse
+
+
+# =========================
+# EXPORT model.pkl → model_flat/
+# =========================
+if __name__ == "__main__":
+    import joblib
+    from predict import MODEL_PATH, file_hash
+
+    model_path = sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else FLAT_MODEL_DIR
+
+    forest = FlatForest.from_model(joblib.load(model_path))
+    forest.save(out_dir, source_hash=file_hash(model_path))
+    print(f"📦 {forest.n_trees} trees / {forest.n_nodes} nodes exported to {out_dir}")
@@ -0,0 +1,111 @@
+from collections import Counter, defaultdict
+from itertools import chain
+
+# =========================
+# TYPO-TOLERANT LOOKUP
+# =========================
+# Reception staff type "headake" or "breathlesness". TrigramIndex finds the
+# closest known phrase without comparing against every phrase: an inverted
+# index from character trigrams to phrases narrows the search to phrases
+# sharing enough trigrams with the query, and only those few candidates get
+# an edit-distance check.
+
+MIN_FUZZY_LENGTH = 5       # shorter words are too easy to confuse ("pain"/"rain")
+TWO_TYPO_LENGTH = 7        # words this long may carry two typos
+MIN_TRIGRAM_SIMILARITY = 0.5
+LOOKUP_MEMO_SIZE = 65536
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(text):
+    """Edit budget for a query: 1 typo from 5 characters, 2 from 7"""
+    if len(text) < MIN_FUZZY_LENGTH:
+        return 0
+    return 1 if len(text) < TWO_TYPO_LENGTH else 2
+
+
+def edit_distance(a, b, limit):
+    """Optimal-string-alignment distance (typos incl. swapped letters).
+
+    Only the diagonal band |i - j| <= limit of the table can stay within
+    limit, so only that band is filled; gives up and returns limit + 1 as
+    soon as the distance must exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    previous2 = None
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        lo, hi = max(1, i - limit), min(len(b), i + limit)
+        for j in range(lo, hi + 1):
+            cb = b[j - 1]
+            d = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                d = min(d, previous2[j - 2] + 1)
+            current[j] = d
+        if min(current[lo - 1:hi + 1]) > limit:
+            return over
+        previous2, previous = previous, current
+    return min(previous[-1], over)
+
+
+class TrigramIndex:
+    """Nearest known phrase within a small edit distance.
+
+    Postings are split by phrase length: a query can only be within k edits
+    of phrases whose length differs by at most k, so only those buckets are
+    counted. Notes repeat the same words all day, so answers are memoised.
+    """
+
+    def __init__(self, phrases, memo_size=LOOKUP_MEMO_SIZE):
+        self.phrases = list(dict.fromkeys(phrases))
+        self._grams = [trigrams(p) for p in self.phrases]
+        self._postings = defaultdict(lambda: defaultdict(list))
+        for i, (phrase, grams) in enumerate(zip(self.phrases, self._grams)):
+            for gram in grams:
+                self._postings[len(phrase)][gram].append(i)
+        self._memo = {}
+        self.memo_size = memo_size
+
+    def lookup(self, query):
+        """Closest phrase to query within max_typos(query), or None"""
+        try:
+            return self._memo[query]
+        except KeyError:
+            pass
+        best = self._lookup(query)
+        if len(self._memo) >= self.memo_size:
+            self._memo.clear()
+        self._memo[query] = best
+        return best
+
+    def _lookup(self, query):
+        limit = max_typos(query)
+        if not limit:
+            return None
+
+        grams = trigrams(query)
+        shared = Counter()
+        for length in range(len(query) - limit, len(query) + limit + 1):
+            postings = self._postings.get(length)
+            if postings:
+                shared.update(chain.from_iterable(postings[g] for g in grams if g in postings))
+
+        best, best_distance = None, limit + 1
+        for i, count in shared.items():
+            # Dice coefficient on trigram sets: cheap filter before edit distance
+            if 2 * count / (len(grams) + len(self._grams[i])) < MIN_TRIGRAM_SIMILARITY:
+                continue
+            distance = edit_distance(query, self.phrases[i], min(limit, best_distance - 1))
+            if distance < best_distance:
+                best, best_distance = self.phrases[i], distance
+        return best
@@ -0,0 +1,85 @@
+import re
+from collections import deque
+
+# =========================
+# MULTI-PHRASE MATCHER
+# =========================
+# Aho–Corasick automaton over word tokens instead of characters. Text is
+# split into lowercase alphanumeric tokens once (in C, via re), then every
+# phrase is found in a single left-to-right pass over those tokens, so the
+# cost grows with the text length, not with phrases x text length. Working
+# on whole tokens also gives word boundaries for free: "cough" does not
+# match inside "coughing", and "chest-pain" matches "chest pain".
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class PhraseMatcher:
+    """Finds every occurrence of many phrases in one linear pass.
+
+    phrases is an iterable of (phrase, payload); match() returns the payload
+    of every phrase found, once per occurrence, in order of where each
+    occurrence ends. match_spans() also says which tokens matched.
+    """
+
+    def __init__(self, phrases):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for phrase, payload in phrases:
+            tokens = tokenize(phrase)
+            if not tokens:
+                continue
+            state = 0
+            for token in tokens:
+                nxt = self._goto[state].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][token] = nxt
+                state = nxt
+            self._out[state] += ((payload, len(tokens)),)
+
+        # Breadth-first so every failure target is finished before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(token, 0) if state else 0
+                self._fail[nxt] = target
+                self._out[nxt] += self._out[target]
+
+    @property
+    def n_states(self):
+        return len(self._goto)
+
+    def match_spans(self, tokens):
+        """(start, end, payload) for every phrase occurring in a token list.
+
+        Tokens tokens[start:end] spell the phrase.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        found = []
+        for i, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for payload, length in out[state]:
+                found.append((i + 1 - length, i + 1, payload))
+        return found
+
+    def match(self, text):
+        """Payloads of all phrases occurring in text"""
+        return [payload for _, _, payload in self.match_spans(tokenize(text))]
@@ -0,0 +1,106 @@
+import os
+import multiprocessing as mp
+from collections import deque
+
+import numpy as np
+
+from predict import Predictor
+
+# =========================
+# MULTI-PROCESS SCORING
+# =========================
+# One process walks the forest on one core. PoolScorer spreads chunks of a
+# batch over worker processes without giving each its own unpickled model:
+#
+#   fork  (Linux/macOS)  workers inherit the parent's loaded Predictor
+#                        copy-on-write
+#   spawn (Windows)      each worker memory-maps ml/model_flat/, so all of
+#                        them read the same physical pages
+#
+# Results always come back in input order.
+
+POOL_CHUNK_SIZE = 16384
+
+_predictor = None  # the Predictor used inside each worker
+
+
+def _init_worker(predictor_kwargs):
+    global _predictor
+    if _predictor is None:
+        _predictor = Predictor(**predictor_kwargs)
+    if _predictor._model is not None:
+        # One core per worker; sklearn must not start its own thread pool
+        _predictor._model.set_params(n_jobs=1)
+
+
+def _score_chunk(X):
+    return _predictor.predict_proba(X)
+
+
+def _score_frame(chunk):
+    return _predictor.score_frame(chunk)
+
+
+class PoolScorer:
+    """Process pool that scores large batches on every core.
+
+    workers defaults to os.cpu_count(). At most 2 x workers chunks are in
+    flight at once, so memory stays bounded however long the input is.
+    """
+
+    def __init__(self, workers=None, chunk_size=POOL_CHUNK_SIZE, predictor=None,
+                 start_method=None):
+        global _predictor
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+        if start_method is None:
+            start_method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+        context = mp.get_context(start_method)
+
+        if start_method == "fork":
+            _predictor = predictor or Predictor()
+            if _predictor.forest is None or _predictor.flat_max_rows is not None:
+                _predictor.model  # unpickle once here, not once per worker
+            predictor_kwargs = {}
+        else:
+            # Fresh interpreters: stay on the memory-mapped flat forest
+            predictor_kwargs = {"cache_size": 0, "flat_max_rows": None}
+            if predictor is not None:
+                predictor_kwargs["model_path"] = predictor.model_path
+                if predictor.stage1 is not None:
+                    predictor_kwargs.update(cascade=True, cascade_threshold=predictor.cascade_threshold)
+
+        self._pool = context.Pool(self.workers, initializer=_init_worker,
+                                  initargs=(predictor_kwargs,))
+
+    def map_ordered(self, fn, items):
+        """Yield fn(item) for every item, in order, with bounded read-ahead"""
+        pending = deque()
+        for item in items:
+            pending.append(self._pool.apply_async(fn, (item,)))
+            if len(pending) >= 2 * self.workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def predict_proba(self, X):
+        """Class probabilities for a dense or CSR batch, split across workers"""
+        n_rows = X.shape[0]
+        chunks = (X[start:start + self.chunk_size] for start in range(0, n_rows, self.chunk_size))
+        parts = list(self.map_ordered(_score_chunk, chunks))
+        return np.vstack(parts) if parts else np.empty((0, 0))
+
+    def score_frames(self, chunks):
+        """Predictor.score_frame over an iterable of DataFrames, in order"""
+        return self.map_ordered(_score_frame, chunks)
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,51 +1,50 @@
-import pandas as pd
-import joblib
 import os
+import sys
+import csv
+import hashlib
+import time
+import json
+import argparse
+import warnings
 import numpy as np
+from dataclasses import dataclass
+
+# pandas, joblib/sklearn and SciPy are imported where they are first needed:
+# scoring a patient on the flat forest touches nothing but NumPy, so short
+# CLI runs and fresh worker processes start without paying for them.
+from forest import FlatForest, FLAT_MODEL_DIR, pack_rows, unique_rows, issparse
+from cache import PredictionCache, PREDICTION_CACHE_SIZE
+from symptom_parser import scan_text
+from rules import RuleEngine, RULES_PATH, load_rules
+from timing import LATENCY
+from cascade import NaiveBayesStage, CASCADE_PATH, cascade_proba
 
 # =========================
 # BASE DIRECTORY
 # =========================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# =========================
-# LOAD TRAINED MODEL
-# =========================
-model = joblib.load(os.path.join(BASE_DIR, "model.pkl"))
+MODEL_PATH = os.path.join(BASE_DIR, "model.pkl")
+SYMPTOMS_PATH = os.path.join(BASE_DIR, "..", "symptoms.txt")
+INPUT_PATH = os.path.join(BASE_DIR, "..", "ai_input.csv")
 
-# =========================
-# LOAD SYMPTOMS LIST
-# =========================
-with open(os.path.join(BASE_DIR, "..", "symptoms.txt")) as f:
-    symptoms = [line.strip() for line in f if line.strip()]
+BATCH_CHUNK_SIZE = 10000
 
-# =========================
-# LOAD AI INPUT FILE
-# =========================
-input_path = os.path.join(BASE_DIR, "..", "ai_input.csv")
-input_data = pd.read_csv(input_path)
+# Above this many distinct rows sklearn's compiled tree walk is faster
+# than the NumPy one (see bench_forest.py)
+FLAT_FOREST_MAX_ROWS = 256
 
-# Remove junk columns
-input_data = input_data.loc[:, ~input_data.columns.str.contains("^unnamed", case=False)]
+# Categories reported per patient, best first
+TOP_K = 3
 
-# Ensure correct feature order
-input_data = input_data.reindex(columns=symptoms, fill_value=0)
-
-# =========================
-# PREDICT CATEGORY
-# =========================
-probs = model.predict_proba(input_data)[0]
-classes = model.classes_
-
-# Get highest probability prediction
-top_idx = np.argmax(probs)
-predicted_category = classes[top_idx]
-confidence = probs[top_idx] * 100
+# Below this confidence (percent) a General Physician should see the
+# patient first
+LOW_CONFIDENCE_THRESHOLD = 55
 
 # =========================
 # CATEGORY → DOCTOR MAP
 # =========================
-specialist_map = {
+SPECIALIST_MAP = {
     "Heart": "Cardiologist",
     "Brain": "Neurologist",
     "Respiratory": "Pulmonologist",
@@ -56,14 +55,576 @@ specialist_map = {
     "General": "General Physician"
 }
 
-doctor = specialist_map.get(predicted_category, "General Physician")
+
+@dataclass(frozen=True)
+class Candidate:
+    """One category in a differential"""
+    category: str
+    confidence: float  # percent, 0-100
+    doctor: str
+
+
+@dataclass(frozen=True)
+class PredictionResult:
+    """One scored patient"""
+    category: str
+    confidence: float  # percent, 0-100
+    doctor: str
+    model_version: str = None  # Predictor.version that produced it
+    differential: tuple = ()  # top-k Candidates, best first (the first is category)
+
+    @property
+    def needs_review(self):
+        return self.confidence < LOW_CONFIDENCE_THRESHOLD
+
+
+def top_k(probs, k=TOP_K):
+    """Column indices and values of the k largest entries of each row, best first.
+
+    A stable sort keeps tied columns in index order, so the first column
+    is always the one argmax picks.
+    """
+    probs = np.atleast_2d(probs)
+    k = max(1, min(k, probs.shape[1]))
+    idx = np.argsort(-probs, axis=1, kind="stable")[:, :k]
+    return idx, np.take_along_axis(probs, idx, axis=1)
+
+
+def load_symptoms(path=SYMPTOMS_PATH):
+    """Load the ordered symptom vocabulary the model was trained on"""
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def file_hash(path):
+    """SHA-256 of a file's contents, used to tell model versions apart"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Predictor:
+    """Trained model + symptom vocabulary, loaded once and reused per prediction.
+
+    Building one of these is the expensive part (unpickling 300 trees), so
+    callers should create it once per process and share it. When an
+    up-to-date flat export of model.pkl exists (see forest.py) it is
+    memory-mapped instead, and model.pkl is only unpickled if a batch too
+    large for the flat forest comes along (flat_max_rows=None keeps every
+    batch on the flat forest). Single and list predictions go through an
+    LRU cache keyed by the patient's symptom bitset; set cache_size=0 to
+    disable it. Batch scoring also applies the safety override rules from
+    rules_path (None skips them).
+
+    With cascade=True every row is first scored by the naive Bayes stage
+    at CASCADE_PATH (see cascade.py), and only rows it is less than
+    cascade_threshold sure of (default: the tuned threshold stored with it)
+    reach the forest. A stage trained with a different model.pkl is ignored.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, symptoms_path=SYMPTOMS_PATH,
+                 cache_size=PREDICTION_CACHE_SIZE, flat_path=FLAT_MODEL_DIR,
+                 flat_max_rows=FLAT_FOREST_MAX_ROWS, rules_path=RULES_PATH,
+                 cascade=False, cascade_path=CASCADE_PATH, cascade_threshold=None):
+        with LATENCY.stage("model_load"):
+            self.model_path = model_path
+            self.flat_max_rows = flat_max_rows
+            self.model_hash = file_hash(model_path)
+            self.symptoms = load_symptoms(symptoms_path)
+            self.symptom_index = {s: i for i, s in enumerate(self.symptoms)}
+            self.rules = RuleEngine(load_rules(rules_path), self.symptoms) if rules_path else None
+
+            self._model = None
+            self.forest = self._load_flat(flat_path)
+            if self.forest is None:
+                try:
+                    self.forest = FlatForest.from_model(self.model)
+                except (AttributeError, ValueError):
+                    # Not a random forest over 0/1 symptoms: score through sklearn
+                    self.forest = None
+            self.classes = self.forest.classes_ if self.forest is not None else self.model.classes_
+            self.stage1 = self._load_stage1(cascade_path) if cascade else None
+            self.cascade_threshold = cascade_threshold
+
+        self.cache = PredictionCache(cache_size, tag=self.model_hash)
+
+    @property
+    def version(self):
+        """Short content hash identifying the loaded model"""
+        return self.model_hash[:12]
+
+    @property
+    def model(self):
+        """The sklearn estimator from model.pkl, unpickled on first use"""
+        if self._model is None:
+            with LATENCY.stage("model_load"):
+                import joblib
+                self._model = joblib.load(self.model_path)
+        return self._model
+
+    def _load_flat(self, flat_path):
+        """Memory-map the flat export if it was made from this model.pkl"""
+        if not flat_path or not os.path.exists(os.path.join(flat_path, "header.json")):
+            return None
+        try:
+            forest, header = FlatForest.load(flat_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        if header.get("source_sha256") != self.model_hash:
+            return None
+        return forest
+
+    def _load_stage1(self, cascade_path):
+        """The cascade's first stage, if it was trained with this model.pkl"""
+        try:
+            stage = NaiveBayesStage.load(cascade_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        if stage.source_hash != self.model_hash or list(stage.classes_) != [str(c) for c in self.classes]:
+            return None
+        return stage
+
+    def encode(self, symptoms):
+        """Turn symptom names and/or column indices into sorted column indices"""
+        indices = set()
+        for s in symptoms:
+            if isinstance(s, str):
+                if s not in self.symptom_index:
+                    raise ValueError(f"Unknown symptom: {s!r}")
+                indices.add(self.symptom_index[s])
+            else:
+                # Only true integers: int() would turn 1.9 or True into column 1
+                if isinstance(s, bool) or not isinstance(s, (int, np.integer)):
+                    raise ValueError(f"Symptom must be a name or an integer index: {s!r}")
+                i = int(s)
+                if not 0 <= i < len(self.symptoms):
+                    raise ValueError(f"Symptom index out of range: {i}")
+                indices.add(i)
+        return sorted(indices)
+
+    def encode_batch(self, batch):
+        """Turn a list of per-patient symptom lists into a CSR 0/1 matrix"""
+        from scipy import sparse
+        indptr = [0]
+        indices = []
+        for symptoms in batch:
+            indices.extend(self.encode(symptoms))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.uint8)
+        return sparse.csr_matrix(
+            (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(batch), len(self.symptoms))
+        )
+
+    def predict_proba(self, X):
+        """Class probabilities for a (rows, symptoms) 0/1 matrix, dense or CSR.
+
+        Repeated symptom combinations are scored once. Small batches go
+        through the flattened forest, large ones through sklearn; both give
+        the same probabilities. With the cascade on, rows the first stage
+        is sure of never reach the forest.
+        """
+        X, inverse = unique_rows(X)
+
+        if self.stage1 is not None:
+            probs, _ = cascade_proba(self.stage1, self.forest_proba, X, self.cascade_threshold)
+        else:
+            probs = self.forest_proba(X)
+        return probs if inverse is None else probs[inverse]
+
+    def forest_proba(self, X):
+        """predict_proba of the forest alone, without collapsing repeated rows"""
+        if self.forest is not None and (self.flat_max_rows is None
+                                        or X.shape[0] <= self.flat_max_rows):
+            return self.forest.predict_proba(X)
+        # The model was fitted on a DataFrame; columns are already in
+        # symptoms.txt order, so the name check only costs time here.
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            return self.model.predict_proba(X)
+
+    def predict(self, symptoms, k=TOP_K):
+        """Score one patient given the symptoms they present with"""
+        with LATENCY.stage("vectorize"):
+            row = np.zeros((1, len(self.symptoms)), dtype=np.uint8)
+            row[0, self.encode(symptoms)] = 1
+            key = np.packbits(row[0]).tobytes()
+
+        with LATENCY.stage("score"):
+            probs = self.cache.get(key)
+            if probs is None:
+                probs = self.predict_proba(row)[0]
+                probs.flags.writeable = False
+                self.cache.put(key, probs)
+
+        with LATENCY.stage("postprocess"):
+            return self._results(probs, k)[0]
+
+    def predict_batch(self, batch, k=TOP_K):
+        """Score many patients: a list of symptom lists or a CSR matrix"""
+        with LATENCY.stage("vectorize"):
+            X = batch if issparse(batch) else self.encode_batch(batch)
+            keys = [row.tobytes() for row in pack_rows(X)]
+
+        with LATENCY.stage("score"):
+            probs = [self.cache.get(key) for key in keys]
+            missing = [i for i, p in enumerate(probs) if p is None]
+            if missing:
+                for i, row_probs in zip(missing, self.predict_proba(X[missing])):
+                    row_probs.flags.writeable = False
+                    self.cache.put(keys[i], row_probs)
+                    probs[i] = row_probs
+
+        with LATENCY.stage("postprocess"):
+            return self._results(np.vstack(probs) if probs else np.empty((0, len(self.classes))), k)
+
+    def predict_file(self, path=INPUT_PATH):
+        """Score the first row of an AI input CSV (one-hot symptom columns), read with the csv module"""
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            values = next(reader, None)
+        if values is None:
+            raise ValueError(f"{path} has no patient row")
+
+        row = np.zeros((1, len(self.symptoms)), dtype=np.uint8)
+        for name, value in zip(header, values):
+            i = self.symptom_index.get(name)
+            if i is not None and value.strip() and float(value) != 0:
+                row[0, i] = 1
+        return self._results(self.predict_proba(row))[0]
+
+    def score_frame(self, chunk):
+        """Score every row of a symptom DataFrame in one predict_proba call.
+
+        Returns the non-symptom columns of ``chunk`` (IDs, labels, ...) with
+        the append_scores() columns added.
+        """
+        from scipy import sparse
+
+        chunk = chunk.loc[:, ~chunk.columns.str.contains("^unnamed", case=False)]
+
+        # Match symptom columns the way train_model.py names them
+        cleaned = (
+            chunk.columns.str.strip()
+            .str.lower()
+            .str.replace(" ", "_")
+            .str.replace("__+", "_", regex=True)
+            .str.replace(".", "", regex=False)
+        )
+        is_symptom = cleaned.isin(self.symptoms)
+        columns = np.array([self.symptom_index[c] for c in cleaned[is_symptom]], dtype=np.int32)
+
+        # A blank cell is an absent symptom; any other value but 0/1 is
+        # rejected, as dataset.build_dataset() does
+        features = chunk.loc[:, is_symptom].fillna(0).to_numpy()
+        if ((features != 0) & (features != 1)).any():
+            raise ValueError("symptom columns must be 0/1")
+
+        # Only the active symptoms of each row are kept from here on
+        rows, cols = np.nonzero(features)
+        X = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.uint8), (rows, columns[cols])),
+            shape=(len(chunk), len(self.symptoms))
+        )
+        X.data[:] = 1  # a symptom listed in two columns is still just present
+
+        out = chunk.loc[:, ~is_symptom].reset_index(drop=True)
+        return self.append_scores(out, X)
+
+    def append_scores(self, out, X, k=TOP_K, fired=None):
+        """Add category, confidence, doctor, override and model_version columns for X's rows to out.
+
+        The runners-up of the top-k differential go in category_2,
+        confidence_2, doctor_2, ... Where a safety override rule fires it
+        sets category and doctor, and confidence and the runners-up (the
+        model's differential, not the rule's) are left empty. fired gives
+        the rule index (-1 for none) per row when the caller checked the
+        notes' text itself; otherwise the rules are checked on X.
+        """
+        idx, values = top_k(self.predict_proba(X), k)
+        categories = self.classes[idx]
+        doctors = np.array([SPECIALIST_MAP.get(str(c), "General Physician") for c in self.classes],
+                           dtype=object)[idx]
+
+        out["category"] = categories[:, 0]
+        out["confidence"] = np.round(values[:, 0] * 100, 2)
+        out["doctor"] = doctors[:, 0]
+        for rank in range(2, idx.shape[1] + 1):
+            out[f"category_{rank}"] = categories[:, rank - 1]
+            out[f"confidence_{rank}"] = np.round(values[:, rank - 1] * 100, 2)
+            out[f"doctor_{rank}"] = doctors[:, rank - 1]
+        out["override"] = False
+
+        if self.rules is not None and self.rules.rules:
+            if fired is None:
+                fired = self.rules.apply(X)
+            hit = fired >= 0
+            if hit.any():
+                rules = [self.rules.rules[r] for r in fired[hit]]
+                out.loc[hit, "category"] = [rule.category for rule in rules]
+                out.loc[hit, "doctor"] = [rule.doctor for rule in rules]
+                out.loc[hit, "confidence"] = np.nan
+                for rank in range(2, idx.shape[1] + 1):
+                    out.loc[hit, [f"category_{rank}", f"confidence_{rank}", f"doctor_{rank}"]] = np.nan
+                out.loc[hit, "override"] = True
+        out["model_version"] = self.version
+        return out
+
+    def _results(self, probs, k=TOP_K):
+        """PredictionResults for each row of a probability matrix"""
+        idx, values = top_k(probs, k)
+        categories = self.classes[idx].astype(str).tolist()
+        confidences = (values * 100).tolist()
+
+        results = []
+        for cats, confs in zip(categories, confidences):
+            differential = tuple(
+                Candidate(c, conf, SPECIALIST_MAP.get(c, "General Physician"))
+                for c, conf in zip(cats, confs)
+            )
+            best = differential[0]
+            results.append(PredictionResult(
+                category=best.category,
+                confidence=best.confidence,
+                doctor=best.doctor,
+                model_version=self.version,
+                differential=differential
+            ))
+        return results
+
+
+def format_result(result):
+    """Render a prediction the way the assistant has always printed it"""
+    text = (
+        "AI MEDICAL ASSISTANT RESULT\n"
+        "----------------------------\n"
+        f"Category Identified   : {result.category}\n"
+        f"Confidence            : {result.confidence:.2f}%\n"
+        f"Recommended Doctor    : {result.doctor}\n"
+    )
+    if len(result.differential) > 1:
+        text += "Other Possibilities   :\n"
+        for rank, c in enumerate(result.differential[1:], start=2):
+            text += f"  {rank}. {c.category} - {c.confidence:.2f}% ({c.doctor})\n"
+    return text + (
+        f"Model Version         : {result.model_version}\n"
+        "----------------------------"
+    )
+
+
+# =========================
+# BATCH SCORING
+# =========================
+def _is_parquet(path):
+    return path.lower().endswith((".parquet", ".pq"))
+
+
+def iter_chunks(path, chunk_size=BATCH_CHUNK_SIZE):
+    """Stream a CSV or Parquet intake file as DataFrames of chunk_size rows"""
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class _ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file as they are produced"""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet_writer = None
+        self.started = False
+
+    def write(self, frame):
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self.parquet_writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="a" if self.started else "w",
+                         header=not self.started, index=False)
+        self.started = True
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+def predict_batch_file(predictor, input_path, output_path,
+                       chunk_size=BATCH_CHUNK_SIZE, log=None, workers=1):
+    """Score a whole intake file chunk by chunk with bounded memory.
+
+    Only a few chunks are held in memory at a time; results are written out
+    in input order as they complete. With workers > 1 chunks are scored by
+    a process pool (see pool.py). Returns (rows scored, seconds taken).
+    """
+    writer = _ChunkWriter(output_path)
+    rows = 0
+    start = time.perf_counter()
+    chunks = iter_chunks(input_path, chunk_size)
+    scorer = None
+    if workers > 1:
+        from pool import PoolScorer
+        scorer = PoolScorer(workers, predictor=predictor)
+        scored = scorer.score_frames(chunks)
+    else:
+        scored = map(predictor.score_frame, chunks)
+    try:
+        for frame in scored:
+            writer.write(frame)
+            rows += len(frame)
+            if log is not None:
+                elapsed = time.perf_counter() - start
+                log(f"  {rows} rows scored ({rows / elapsed:,.0f} rows/s)")
+    finally:
+        writer.close()
+        if scorer is not None:
+            scorer.close()
+    return rows, time.perf_counter() - start
+
+
+# =========================
+# JSONL CO-PROCESS MODE
+# =========================
+def override_response(rule):
+    """Response fields for a patient a safety override rule decided.
+
+    As in append_scores(), the model's confidence and differential are
+    dropped: the rule, not the model, picked the doctor.
+    """
+    return {"category": rule.category, "confidence": None, "doctor": rule.doctor,
+            "differential": [], "override": True}
+
+
+def handle_request(predictor, request):
+    """Answer one JSONL request: {"symptoms": [...]} or {"text": "..."}.
+
+    An optional "id" is echoed back so callers can pipeline requests. The
+    safety override rules are checked on the text's trigger phrases, or on
+    the listed symptoms' names, and win over the model ("override": true).
+    """
+    # Parse, encode and score on one model version even if a reload lands meanwhile
+    predictor = getattr(predictor, "current", predictor)
+    response = {"id": request.get("id")} if isinstance(request, dict) else {"id": None}
+    try:
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+        if "symptoms" in request:
+            symptoms = request["symptoms"]
+            if not isinstance(symptoms, list):
+                raise ValueError("'symptoms' must be a list of names or indices")
+            indices = predictor.encode(symptoms)
+            with LATENCY.stage("override"):
+                rule = predictor.rules.check(indices) if predictor.rules is not None else None
+        elif "text" in request:
+            parsed = scan_text(str(request["text"]), predictor.symptoms, predictor.rules)
+            symptoms = sorted(parsed.symptoms)
+            with LATENCY.stage("override"):
+                rule = predictor.rules.check_phrases(parsed.triggers) if predictor.rules is not None else None
+        else:
+            raise ValueError("request needs 'symptoms' or 'text'")
+
+        result = predictor.predict(symptoms)
+    except (ValueError, TypeError) as e:
+        response["error"] = str(e)
+        return response
+    except Exception as e:
+        # The caller keeps one warm process; no single request may end it
+        response["error"] = f"{type(e).__name__}: {e}"
+        return response
+
+    response.update(
+        category=result.category,
+        confidence=round(result.confidence, 2),
+        doctor=result.doctor,
+        symptoms=[predictor.symptoms[i] for i in predictor.encode(symptoms)],
+        model_version=result.model_version,
+        differential=[
+            {"category": c.category, "confidence": round(c.confidence, 2), "doctor": c.doctor}
+            for c in result.differential
+        ],
+        override=False,
+    )
+    if rule is not None:
+        response.update(override_response(rule))
+    return response
+
+
+def serve_jsonl(predictor, stdin=sys.stdin, stdout=sys.stdout):
+    """One JSON request per input line, one JSON result per output line.
+
+    Each answer is flushed immediately, so a caller can keep one warm
+    process and talk to it over pipes. Ends at EOF.
+    """
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            response = {"id": None, "error": f"invalid JSON: {e}"}
+        else:
+            response = handle_request(predictor, request)
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AI medical assistant prediction")
+    parser.add_argument("--batch", metavar="INPUT",
+                        help="score every row of a CSV/Parquet file instead of ai_input.csv")
+    parser.add_argument("--output", metavar="OUTPUT",
+                        help="where to write batch results (default: <INPUT>_predictions.csv)")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE,
+                        help="rows per predict_proba call in batch mode")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes used to score chunks in batch mode")
+    parser.add_argument("--serve", action="store_true",
+                        help="read JSON requests from stdin, write JSON results to stdout")
+    parser.add_argument("--cascade", action="store_true",
+                        help="in batch mode, send only rows the naive Bayes first stage is unsure of to the forest")
+    return parser.parse_args(argv)
+
 
 # =========================
 # OUTPUT RESULT
 # =========================
-print("AI MEDICAL ASSISTANT RESULT")
-print("----------------------------")
-print(f"Category Identified   : {predicted_category}")
-print(f"Confidence            : {confidence:.2f}%")
-print(f"Recommended Doctor    : {doctor}")
-print("----------------------------")
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.serve:
+        # Long-lived: pick up retrained models without a restart
+        from reload import ReloadingPredictor
+        predictor = ReloadingPredictor().start()
+        print("🤖 AI assistant ready: one JSON request per line", file=sys.stderr)
+        serve_jsonl(predictor)
+        return
+
+    predictor = Predictor(cascade=args.cascade)
+
+    if args.batch:
+        output = args.output or os.path.splitext(args.batch)[0] + "_predictions.csv"
+        print(f"📥 Scoring {args.batch} in chunks of {args.chunk_size}")
+        rows, seconds = predict_batch_file(
+            predictor, args.batch, output, args.chunk_size, log=print, workers=args.workers
+        )
+        rate = rows / seconds if seconds > 0 else float("inf")
+        print(f"✅ {rows} rows in {seconds:.2f}s ({rate:,.0f} rows/s)")
+        print(f"📦 Results saved to {output}")
+        return
+
+    print(format_result(predictor.predict_file(INPUT_PATH)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
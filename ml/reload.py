@@ -0,0 +1,155 @@
+import os
+import time
+import threading
+
+from predict import Predictor, MODEL_PATH, SYMPTOMS_PATH, file_hash
+from forest import FLAT_MODEL_DIR
+from rules import RULES_PATH
+from cascade import CASCADE_PATH
+
+# =========================
+# HOT MODEL RELOAD
+# =========================
+# A retrain rewrites model.pkl (and maybe symptoms.txt) under a running app.
+# ReloadingPredictor polls those files, builds a fresh Predictor for a new
+# version on its own thread, and swaps it in with one reference assignment.
+#
+# Every call is answered by whichever Predictor was current when it
+# started, so in-flight requests finish on the old version and the new
+# one only takes traffic once it is fully loaded. Callers that make several
+# calls that must agree (encode, then predict) should take .current once
+# and use that.
+
+RELOAD_POLL_SECONDS = 2.0
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ReloadingPredictor:
+    """A Predictor that follows changes to its model and vocabulary files.
+
+    Attribute access is passed through to the current Predictor, so this
+    can stand in for one anywhere. Call start() to poll in the background
+    every poll_seconds, or check() to poll once on the caller's thread.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, symptoms_path=SYMPTOMS_PATH,
+                 poll_seconds=RELOAD_POLL_SECONDS, **predictor_kwargs):
+        self.model_path = model_path
+        self.symptoms_path = symptoms_path
+        self.poll_seconds = poll_seconds
+        self.predictor_kwargs = predictor_kwargs
+
+        flat_path = predictor_kwargs.get("flat_path", FLAT_MODEL_DIR)
+        rules_path = predictor_kwargs.get("rules_path", RULES_PATH)
+        self.watched = [model_path, symptoms_path]
+        if flat_path:
+            self.watched.append(os.path.join(flat_path, "header.json"))
+        if rules_path:
+            self.watched.append(rules_path)
+        if predictor_kwargs.get("cascade"):
+            self.watched.append(predictor_kwargs.get("cascade_path", CASCADE_PATH))
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._failed = None
+
+        self._seen = self._stats()
+        self._content = self._hashes()
+        self.current = self._build()
+        self._loaded = self._seen
+        self.loaded_at = time.time()
+
+    def __getattr__(self, name):
+        # Only reached for names not set on the wrapper itself
+        if name == "current":
+            raise AttributeError(name)
+        return getattr(self.current, name)
+
+    def _stats(self):
+        return tuple(_stat(path) for path in self.watched)
+
+    def _hashes(self):
+        return tuple(file_hash(path) if os.path.exists(path) else None for path in self.watched)
+
+    def _build(self):
+        predictor = Predictor(self.model_path, self.symptoms_path, **self.predictor_kwargs)
+        # Touch the forest once so the first real request doesn't fault in
+        # the memory-mapped pages
+        predictor.predict_proba(predictor.encode_batch([[]]))
+        return predictor
+
+    def check(self):
+        """Reload if the watched files changed and have stopped changing.
+
+        A change is only acted on once two polls in a row see the same file
+        sizes and mtimes, so a model that is still being written is never
+        loaded. Returns True if a new Predictor was swapped in.
+        """
+        with self._lock:
+            stats = self._stats()
+            settled = stats == self._seen
+            self._seen = stats
+            if not settled or stats in (self._loaded, self._failed):
+                return False
+
+            old = self.current
+            try:
+                content = self._hashes()
+                if content == self._content:
+                    # Touched or rewritten with the same bytes
+                    self._loaded = stats
+                    return False
+                new = self._build()
+                if old._model is not None:
+                    new.model  # old version had unpickled it; don't make a request wait for that
+            except Exception as e:
+                # Broken files: keep serving the old version until they change again
+                self._failed = stats
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                return False
+
+            self.current = new
+            self._loaded = stats
+            self._content = content
+            self.reloads += 1
+            self.last_error = None
+            self.loaded_at = time.time()
+            return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            self.check()
+
+    def start(self):
+        """Poll for new versions on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="model-reload", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def status(self):
+        return {
+            "version": self.current.version,
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,160 @@
+import os
+import csv
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from forest import pack_rows, issparse
+from matcher import tokenize
+
+# =========================
+# SAFETY OVERRIDE RULES
+# =========================
+# Red-flag combinations that route a patient to a specialist no matter what
+# the model says. Rules live in override_rules.csv, one per line:
+#
+#   category,doctor,priority,threshold,triggers
+#   Heart,Cardiologist,1,2,chest pain;shortness of breath;sweating
+#
+# A rule fires when at least `threshold` of its distinct trigger phrases
+# are present; the lowest priority number wins. Triggers are phrases, not
+# symptoms: "shortness of breath" and "difficulty breathing" are two
+# triggers although both parse to breathlessness. A free-text note is
+# checked on the trigger phrases the parser found in it (check_phrases).
+#
+# Rows that only carry symptom columns (batch files, Dataset rows) are
+# checked as a note listing those symptoms by name would be: a column
+# counts where its name is one of the rule's phrases. Each rule is compiled
+# into a bitmask over the symptom bitset the model consumes (pack_rows
+# layout), so checking a row is an AND plus a popcount per rule, and whole
+# batches are checked at once with NumPy.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RULES_PATH = os.path.join(BASE_DIR, "override_rules.csv")
+RULE_CHUNK_ROWS = 65536
+
+
+def normalise_phrase(phrase):
+    """Spelling a phrase is matched under: lowercase words joined by single spaces"""
+    return " ".join(tokenize(phrase.replace("_", " ")))
+
+
+@dataclass(frozen=True)
+class OverrideRule:
+    category: str
+    doctor: str
+    priority: int
+    threshold: int
+    triggers: tuple  # normalised phrases
+
+
+def load_rules(path=RULES_PATH):
+    """Read override rules from CSV, highest priority first"""
+    rules = []
+    with open(path, newline="") as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            triggers = tuple(dict.fromkeys(
+                normalise_phrase(t) for t in row["triggers"].split(";") if normalise_phrase(t)
+            ))
+            rule = OverrideRule(
+                category=row["category"].strip(),
+                doctor=row["doctor"].strip(),
+                priority=int(row["priority"]),
+                threshold=int(row["threshold"]),
+                triggers=triggers,
+            )
+            if not 1 <= rule.threshold <= len(triggers):
+                raise ValueError(f"{path}:{line}: threshold must be between 1 and the number of triggers")
+            rules.append(rule)
+    return sorted(rules, key=lambda r: r.priority)
+
+
+class RuleEngine:
+    """Override rules compiled against one symptom vocabulary"""
+
+    def __init__(self, rules, vocabulary):
+        self.rules = sorted(rules, key=lambda r: r.priority)
+        self.symptom_index = {s: i for i, s in enumerate(vocabulary)}
+        self.n_features = len(vocabulary)
+
+        # Every distinct trigger phrase gets a bit of its own
+        self.phrases = tuple(dict.fromkeys(t for rule in self.rules for t in rule.triggers))
+        self.phrase_index = {p: i for i, p in enumerate(self.phrases)}
+        self._phrase_masks = [sum(1 << self.phrase_index[t] for t in rule.triggers)
+                              for rule in self.rules]
+
+        # Symptom columns whose name is a trigger phrase
+        column_of = {normalise_phrase(s): i for s, i in self.symptom_index.items()}
+
+        # Row bitsets are padded to whole 64-bit words before the AND
+        self.n_bytes = (self.n_features + 7) // 8
+        n_words = (self.n_bytes + 7) // 8
+        masks = np.zeros((len(self.rules), n_words * 8), dtype=np.uint8)
+        self._int_masks = []
+        for r, rule in enumerate(self.rules):
+            cols = np.array([column_of[t] for t in rule.triggers if t in column_of], dtype=np.intp)
+            np.bitwise_or.at(masks[r], cols >> 3, (0x80 >> (cols & 7)).astype(np.uint8))
+            self._int_masks.append(sum(1 << int(c) for c in cols))
+        self.masks = masks.view(np.uint64)
+        self.thresholds = np.array([rule.threshold for rule in self.rules])
+
+    def check_phrases(self, phrases):
+        """First rule fired by the trigger phrases found in one note, or None"""
+        bits = 0
+        for p in phrases:
+            i = self.phrase_index.get(p)
+            if i is not None:
+                bits |= 1 << i
+        for rule, mask in zip(self.rules, self._phrase_masks):
+            if (bits & mask).bit_count() >= rule.threshold:
+                return rule
+        return None
+
+    def check(self, indices):
+        """First rule fired by one patient's symptom column indices, or None"""
+        bits = 0
+        for i in indices:
+            bits |= 1 << int(i)
+        for rule, mask in zip(self.rules, self._int_masks):
+            if (bits & mask).bit_count() >= rule.threshold:
+                return rule
+        return None
+
+    def check_names(self, symptoms):
+        """Same as check() for symptom names; names outside the vocabulary are ignored"""
+        return self.check(self.symptom_index[s] for s in symptoms if s in self.symptom_index)
+
+    def apply_packed(self, packed):
+        """Index of the rule fired by each row of pack_rows() output, -1 for none"""
+        packed = np.asarray(packed, dtype=np.uint8)
+        padded = np.zeros((len(packed), self.masks.shape[1] * 8), dtype=np.uint8)
+        padded[:, :packed.shape[1]] = packed
+        # One contiguous run per 64-bit word, so each AND streams through memory
+        words = np.ascontiguousarray(padded.view(np.uint64).T)
+
+        # Walk rules from lowest priority up so the highest one fired wins
+        out = np.full(len(packed), -1, dtype=np.intp)
+        hits = np.empty(len(packed), dtype=np.uint8)
+        for r in range(len(self.rules) - 1, -1, -1):
+            hits[:] = 0
+            for k in np.flatnonzero(self.masks[r]):
+                hits += np.bitwise_count(words[k] & self.masks[r, k])
+            out[hits >= self.thresholds[r]] = r
+        return out
+
+    def apply(self, X):
+        """Index of the rule fired by each row of a 0/1 matrix (dense or CSR), -1 for none"""
+        if not issparse(X):
+            X = np.asarray(X)
+        out = np.empty(X.shape[0], dtype=np.intp)
+        for start in range(0, X.shape[0], RULE_CHUNK_ROWS):
+            chunk = X[start:start + RULE_CHUNK_ROWS]
+            out[start:start + chunk.shape[0]] = self.apply_packed(pack_rows(chunk))
+        return out
+
+
+@lru_cache(maxsize=8)
+def get_engine(vocabulary, path=RULES_PATH):
+    """Shared RuleEngine for a vocabulary (pass a tuple)"""
+    return RuleEngine(load_rules(path), vocabulary)
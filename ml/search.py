@@ -0,0 +1,335 @@
+import os
+import sys
+import csv
+import json
+import time
+import pickle
+import hashlib
+import argparse
+import itertools
+import warnings
+import multiprocessing as mp
+
+import numpy as np
+
+from dataset import load_dataset, fingerprint, TRAINING_PATH, TESTING_PATH
+from training import (balanced_rows, balanced_distinct_rows, fit_forest,
+                      N_ESTIMATORS, MAX_DEPTH, MIN_SAMPLES_LEAF, MAX_FEATURES)
+from forest import FlatForest
+from tune_cascade import drop_symptoms, DROP_FRACTION
+
+# =========================
+# HYPERPARAMETER SEARCH
+# =========================
+# Fits every configuration of SEARCH_GRID (or a random sample of it) on all
+# cores. The balanced training rows are built once from the cached Dataset
+# and handed to each worker when it starts. --recipe picks how they are
+# fitted: "full" is what train_model.py ships by default (every balanced
+# row, bootstrapped), "collapsed" is train_model.py --collapse-duplicates.
+# For every configuration it records:
+#
+#   fit_s            fit time on one core
+#   model_kb         pickled size of the forest
+#   single_ms        one patient through the flat forest (the app's path)
+#   batch_rows_s     sklearn predict_proba throughput on BATCH_ROWS rows
+#   accuracy         accuracy on Testing.csv
+#   sparse_accuracy  Testing.csv repeated SPARSE_COPIES times, half of each
+#                    row's symptoms dropped
+#
+# Testing.csv alone cannot tell most configurations apart, hence the sparse
+# set. Latencies are measured in this process once the pool is closed, so
+# fits on the other cores do not distort them.
+#
+# Results are appended to RESULTS_PATH keyed by recipe, configuration and
+# the fingerprint of both datasets: a rerun only evaluates what is missing, and
+# changed data starts over. The report keeps the Pareto front (nothing else
+# is at least as accurate on both sets and at least as fast on both
+# latencies) and names the fastest single-row configuration within
+# --max-drop accuracy points of the current settings on both sets.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = os.path.join(BASE_DIR, "search_results.jsonl")
+REPORT_PATH = os.path.join(BASE_DIR, "search_report.csv")
+
+RECIPES = {
+    "full": "every balanced row, bootstrapped (train_model.py)",
+    "collapsed": "distinct rows with copy counts (train_model.py --collapse-duplicates)",
+}
+
+SEARCH_GRID = {
+    "n_estimators": [50, 100, 200, 300],
+    "max_depth": [8, 12, 18, None],
+    "min_samples_leaf": [1, 3, 5],
+    "max_features": ["sqrt", "log2"],
+}
+CURRENT = {
+    "n_estimators": N_ESTIMATORS,
+    "max_depth": MAX_DEPTH,
+    "min_samples_leaf": MIN_SAMPLES_LEAF,
+    "max_features": MAX_FEATURES,
+}
+
+BATCH_ROWS = 10000
+SPARSE_COPIES = 20
+SINGLE_ROW_REPEATS = 200
+SEED = 0
+
+REPORT_COLUMNS = ["recipe", "n_estimators", "max_depth", "min_samples_leaf", "max_features",
+                  "accuracy", "sparse_accuracy", "single_ms", "batch_rows_s",
+                  "fit_s", "model_kb", "pareto"]
+
+_data = None  # set in each worker by _init_worker
+
+
+def config_key(config):
+    return json.dumps(config, sort_keys=True)
+
+
+def grid(space=SEARCH_GRID):
+    """Every combination of the search space, CURRENT first"""
+    names = sorted(space)
+    configs = [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+    configs.sort(key=lambda c: c != CURRENT)
+    return configs
+
+
+def data_fingerprint(train_source, test_source):
+    pair = json.dumps([fingerprint(train_source), fingerprint(test_source)])
+    return hashlib.sha256(pair.encode()).hexdigest()[:16]
+
+
+# =========================
+# RESULT CACHE
+# =========================
+def load_results(path, data_hash, recipe):
+    """Finished results for this data and recipe, keyed by configuration"""
+    results = {}
+    if not os.path.exists(path):
+        return results
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a run killed mid-write
+            if record.get("data") == data_hash and record.get("recipe") == recipe:
+                results[config_key(record["config"])] = record
+    return results
+
+
+def append_result(path, record):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+# =========================
+# EVALUATION
+# =========================
+def training_rows(dataset, recipe):
+    """(X, y, counts) that train_model.py fits with this recipe; counts is None for "full" """
+    if recipe == "collapsed":
+        return balanced_distinct_rows(dataset)
+    df = balanced_rows(dataset.frame())
+    return df.drop(["prognosis", "category"], axis=1), df["category"], None
+
+
+def _init_worker(data):
+    global _data
+    _data = data
+    import sklearn.ensemble  # noqa: F401 (kept out of the first fit's time)
+
+
+def _fit(config):
+    """Worker: fit one configuration on one core and score its accuracy"""
+    X, y, counts, X_test, X_sparse, sparse_labels = _data
+    labels = sparse_labels[:len(X_test)]
+    start = time.perf_counter()
+    model = fit_forest(X, y, counts, n_jobs=1, **config)
+    fit_s = time.perf_counter() - start
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        accuracy = (model.predict(X_test) == labels).mean()
+        sparse_accuracy = (model.predict(X_sparse) == sparse_labels).mean()
+    return config, pickle.dumps(model), {
+        "fit_s": fit_s,
+        "accuracy": float(accuracy),
+        "sparse_accuracy": float(sparse_accuracy),
+    }
+
+
+def latency(blob, X_test, X_batch):
+    """Single-row (flat forest) and batch (sklearn) latency of a pickled forest"""
+    model = pickle.loads(blob)
+    model.set_params(n_jobs=1)
+    forest = FlatForest.from_model(model)
+
+    row = X_test[:1]
+    forest.predict_proba(row)
+    start = time.perf_counter()
+    for _ in range(SINGLE_ROW_REPEATS):
+        forest.predict_proba(row)
+    single_ms = (time.perf_counter() - start) / SINGLE_ROW_REPEATS * 1000
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        start = time.perf_counter()
+        model.predict_proba(X_batch)
+        batch_rows_s = len(X_batch) / (time.perf_counter() - start)
+
+    return {
+        "single_ms": single_ms,
+        "batch_rows_s": batch_rows_s,
+        "model_kb": len(blob) / 1024,
+        "nodes": forest.n_nodes,
+    }
+
+
+def run(configs, data, X_batch, data_hash, recipe, workers, results_path):
+    """Fit configs in a pool of workers, then time each model here and cache its result"""
+    X_test = data[3]
+    start_method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+    context = mp.get_context(start_method)
+    fitted = []
+    with context.Pool(min(workers, len(configs)), initializer=_init_worker, initargs=(data,)) as pool:
+        for i, (config, blob, scores) in enumerate(pool.imap_unordered(_fit, configs), start=1):
+            print(f"  fitted {i}/{len(configs)}: {describe(config)} in {scores['fit_s']:.1f} s")
+            fitted.append((config, blob, scores))
+
+    records = []
+    for config, blob, scores in fitted:
+        record = {"config": config, "data": data_hash, "recipe": recipe, **scores, **latency(blob, X_test, X_batch)}
+        append_result(results_path, record)
+        records.append(record)
+    return records
+
+
+# =========================
+# REPORT
+# =========================
+def dominates(a, b):
+    """a is no worse than b on every objective and better on one"""
+    no_worse = (a["accuracy"] >= b["accuracy"] and a["sparse_accuracy"] >= b["sparse_accuracy"]
+                and a["single_ms"] <= b["single_ms"] and a["batch_rows_s"] >= b["batch_rows_s"])
+    better = (a["accuracy"] > b["accuracy"] or a["sparse_accuracy"] > b["sparse_accuracy"]
+              or a["single_ms"] < b["single_ms"] or a["batch_rows_s"] > b["batch_rows_s"])
+    return no_worse and better
+
+
+def pareto_front(records):
+    return [r for r in records if not any(dominates(o, r) for o in records)]
+
+
+def recommend(records, current, max_drop):
+    """Fastest single-row configuration within max_drop points of current on both sets"""
+    good = [r for r in records
+            if r["accuracy"] >= current["accuracy"] - max_drop / 100
+            and r["sparse_accuracy"] >= current["sparse_accuracy"] - max_drop / 100]
+    return min(good, key=lambda r: r["single_ms"]) if good else None
+
+
+def describe(config):
+    return (f"trees={config['n_estimators']} depth={config['max_depth']} "
+            f"leaf={config['min_samples_leaf']} features={config['max_features']}")
+
+
+def print_table(records, current=None):
+    print(f"{'trees':>6} {'depth':>6} {'leaf':>5} {'feat':>5} {'accuracy':>9} {'sparse':>7} "
+          f"{'1-row ms':>9} {'batch rows/s':>13} {'fit s':>7} {'KB':>8}")
+    for r in sorted(records, key=lambda r: r["single_ms"]):
+        c = r["config"]
+        mark = " ← current" if r is current else ""
+        print(f"{c['n_estimators']:>6} {str(c['max_depth']):>6} {c['min_samples_leaf']:>5} "
+              f"{c['max_features']:>5} {r['accuracy']:>9.1%} {r['sparse_accuracy']:>7.1%} "
+              f"{r['single_ms']:>9.3f} {r['batch_rows_s']:>13,.0f} {r['fit_s']:>7.1f} "
+              f"{r['model_kb']:>8,.0f}{mark}")
+
+
+def write_report(path, records, front):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        for r in sorted(records, key=lambda r: r["single_ms"]):
+            writer.writerow({**r["config"], **{k: r[k] for k in REPORT_COLUMNS[5:-1]},
+                             "recipe": r["recipe"],
+                             "pareto": r in front})
+
+
+# =========================
+# MAIN
+# =========================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter search for the category forest")
+    parser.add_argument("--random", type=int, metavar="N",
+                        help="evaluate N random configurations of the grid instead of all of it")
+    parser.add_argument("--recipe", choices=sorted(RECIPES), default="full",
+                        help="how each configuration is fitted (default: as train_model.py ships it)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-drop", type=float, default=0.0,
+                        help="accuracy points a recommendation may lose against the current settings")
+    parser.add_argument("--drop", type=float, default=DROP_FRACTION,
+                        help="fraction of symptoms removed for the sparse test set")
+    parser.add_argument("--results", default=RESULTS_PATH, help="JSONL result cache")
+    parser.add_argument("--report", default=REPORT_PATH, help="CSV report of every configuration")
+    parser.add_argument("--seed", type=int, default=SEED)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configs = grid()
+    if args.random is not None:
+        rng = np.random.default_rng(args.seed)
+        sample = rng.choice(len(configs) - 1, min(args.random, len(configs) - 1), replace=False)
+        configs = [configs[0]] + [configs[1 + i] for i in sorted(sample)]
+
+    data_hash = data_fingerprint(TRAINING_PATH, TESTING_PATH)
+    done = load_results(args.results, data_hash, args.recipe)
+    todo = [c for c in configs if config_key(c) not in done]
+
+    print("🔎 HYPERPARAMETER SEARCH")
+    print("--------------------------------")
+    print(f"Recipe                : {args.recipe}, {RECIPES[args.recipe]}")
+    print(f"Configurations        : {len(configs)} ({len(configs) - len(todo)} cached)")
+
+    if todo:
+        train = load_dataset(TRAINING_PATH)
+        test = load_dataset(TESTING_PATH)
+        X, y, counts = training_rows(train, args.recipe)
+        X_test = test.matrix(train.columns)
+        X_sparse = drop_symptoms(np.tile(X_test, (SPARSE_COPIES, 1)), args.drop,
+                                 np.random.default_rng(args.seed))
+        X_batch = X_test[np.arange(BATCH_ROWS) % len(X_test)]
+        if counts is None:
+            print(f"Training rows         : {len(X)} balanced")
+        else:
+            print(f"Training rows         : {len(X)} distinct ({int(counts.sum())} balanced)")
+        print(f"Workers               : {min(args.workers, len(todo))}")
+        data = (X, y, counts, X_test, X_sparse, np.tile(test.category, SPARSE_COPIES))
+        for record in run(todo, data, X_batch, data_hash, args.recipe, args.workers, args.results):
+            done[config_key(record["config"])] = record
+
+    records = [done[config_key(c)] for c in configs]
+    front = pareto_front(records)
+    current = done.get(config_key(CURRENT))
+
+    print(f"\n📋 Pareto front ({len(front)} of {len(records)}, {args.recipe} recipe)")
+    print_table(front, current)
+    if current is not None and current not in front:
+        print("\n📋 Current settings (dominated)")
+        print_table([current], current)
+
+    write_report(args.report, records, front)
+    print(f"\n📦 Report written to {args.report}")
+
+    if current is None:
+        return 0
+    best = recommend(records, current, args.max_drop)
+    print(f"✅ Fastest within {args.max_drop} points of the current settings: {describe(best['config'])}")
+    if best is not current:
+        print(f"   {current['single_ms'] / best['single_ms']:.1f}x faster per patient, "
+              f"{best['model_kb'] / current['model_kb']:.0%} of the current model's size")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
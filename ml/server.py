@@ -0,0 +1,287 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from predict import Predictor, override_response
+from reload import ReloadingPredictor, RELOAD_POLL_SECONDS
+from timing import LATENCY, percentile
+
+# =========================
+# LOCAL INFERENCE SERVER
+# =========================
+# Several reception desks registering at once each need a prediction. The
+# server queues concurrent requests for a short window (or until a batch is
+# full) and scores them with a single model call, so the per-call forest
+# overhead is paid once per batch instead of once per patient.
+#
+#   POST /predict   {"symptoms": ["cough", "headache"]}  -> prediction (a safety
+#                   override rule that fires wins, with "override": true)
+#   GET  /stats     queue depth, batch sizes, latency percentiles (also per
+#                   prediction stage), model version, prediction cache
+#   GET  /health
+#
+# Plain HTTP/1.1 (keep-alive) over TCP or a Unix socket, e.g.
+#   curl --unix-socket /tmp/ai.sock -d '{"symptoms": ["cough"]}' localhost/predict
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+BATCH_WINDOW_MS = 2.0
+MAX_BATCH_SIZE = 64
+LATENCY_SAMPLES = 10000
+
+
+class ServerStats:
+    """Counters for the batcher; latencies are kept for the last N requests"""
+
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.requests = 0
+        self.rejected = 0
+        self.errors = 0
+        self.batches = 0
+        self.batch_sizes = Counter()
+        self.max_queue_depth = 0
+        self.latencies_ms = deque(maxlen=samples)
+
+    def to_dict(self, queue_depth):
+        latencies = sorted(self.latencies_ms)
+        return {
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "batch_sizes": {str(k): v for k, v in sorted(self.batch_sizes.items())},
+            "queue_depth": queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "latency_ms": {
+                "p50": percentile(latencies, 50),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else 0.0,
+            },
+        }
+
+
+class MicroBatcher:
+    """Collects concurrent predictions and scores them together.
+
+    A batch is closed window_ms after its first request arrives or as soon
+    as it holds max_batch requests, whichever comes first. Scoring runs on
+    one worker thread so the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(self, predictor, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH_SIZE):
+        self.predictor = predictor
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.stats = ServerStats()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def submit(self, symptoms):
+        """Queue one patient and wait for their PredictionResult"""
+        # Reject bad input before batching. Names, not column indices, are
+        # queued: a reloaded vocabulary may number the columns differently.
+        predictor = getattr(self.predictor, "current", self.predictor)
+        names = [predictor.symptoms[i] for i in predictor.encode(symptoms)]
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((names, future, time.perf_counter()))
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.queue.qsize())
+        return await future
+
+    def override(self, symptoms):
+        """Safety override rule fired by one patient's symptoms, or None"""
+        predictor = getattr(self.predictor, "current", self.predictor)
+        if predictor.rules is None:
+            return None
+        with LATENCY.stage("override"):
+            return predictor.rules.check(predictor.encode(symptoms))
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.predictor.predict_batch, [item[0] for item in batch]
+                )
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self.stats.errors += len(batch)
+                continue
+
+            now = time.perf_counter()
+            for (_, future, queued_at), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+                self.stats.latencies_ms.append((now - queued_at) * 1000)
+            self.stats.requests += len(batch)
+            self.stats.batches += 1
+            self.stats.batch_sizes[len(batch)] += 1
+
+    def stats_dict(self):
+        stats = self.stats.to_dict(self.queue.qsize())
+        if isinstance(self.predictor, ReloadingPredictor):
+            stats["model"] = self.predictor.status()
+        else:
+            stats["model"] = {"version": self.predictor.version}
+        stats["cache"] = getattr(self.predictor, "current", self.predictor).cache.stats()
+        stats["stages"] = LATENCY.summary()
+        return stats
+
+
+class InferenceServer:
+    """Minimal HTTP/1.1 front end for a MicroBatcher"""
+
+    def __init__(self, predictor, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH_SIZE):
+        self.batcher = MicroBatcher(predictor, window_ms, max_batch)
+        self._server = None
+        self._batch_task = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """Start listening; port=0 picks a free port (see .port)"""
+        self._batch_task = asyncio.create_task(self.batcher.run())
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            self._server = await asyncio.start_unix_server(self.handle, path=unix_path)
+        else:
+            self._server = await asyncio.start_server(self.handle, host, port)
+        return self
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._batch_task.cancel()
+        self.batcher.executor.shutdown(wait=False)
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def route(self, method, path, body):
+        if method == "POST" and path == "/predict":
+            try:
+                request = json.loads(body or b"{}")
+                symptoms = request["symptoms"]
+                if isinstance(symptoms, str) or not isinstance(symptoms, list):
+                    raise ValueError("'symptoms' must be a list of names or indices")
+                rule = self.batcher.override(symptoms)
+                result = await self.batcher.submit(symptoms)
+            except (ValueError, KeyError, TypeError, OverflowError) as e:
+                self.batcher.stats.rejected += 1
+                return "400 Bad Request", {"error": str(e)}
+            except Exception as e:
+                # Anything else (e.g. a scoring failure passed on by the
+                # batcher) still gets an answer instead of a dropped connection
+                return "500 Internal Server Error", {"error": f"{type(e).__name__}: {e}"}
+            response = {
+                "category": result.category,
+                "confidence": round(result.confidence, 2),
+                "doctor": result.doctor,
+                "model_version": result.model_version,
+                "differential": [
+                    {"category": c.category, "confidence": round(c.confidence, 2), "doctor": c.doctor}
+                    for c in result.differential
+                ],
+                "override": False,
+            }
+            if rule is not None:
+                response.update(override_response(rule))
+            return "200 OK", response
+        if method == "GET" and path == "/stats":
+            return "200 OK", self.batcher.stats_dict()
+        if method == "GET" and path == "/health":
+            return "200 OK", {"status": "ok"}
+        return "404 Not Found", {"error": f"No route for {method} {path}"}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self.route(method, path, body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local micro-batching AI inference server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW_MS,
+                        help="how long to wait for more requests before scoring a batch")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH_SIZE,
+                        help="score as soon as this many requests are queued")
+    parser.add_argument("--reload-seconds", type=float, default=RELOAD_POLL_SECONDS,
+                        help="how often to check for a retrained model (0 disables reloading)")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    if args.reload_seconds > 0:
+        predictor = ReloadingPredictor(poll_seconds=args.reload_seconds).start()
+    else:
+        predictor = Predictor()
+    server = await InferenceServer(predictor, args.window_ms, args.max_batch).start(
+        args.host, args.port, args.unix
+    )
+    where = args.unix or f"http://{args.host}:{server.port}"
+    print(f"🚀 AI inference server listening on {where}")
+    print(f"   batching window {args.window_ms} ms, max batch {args.max_batch}")
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,213 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from matcher import PhraseMatcher, tokenize
+from fuzzy import TrigramIndex
+
+# =========================
+# FREE-TEXT SYMPTOM PARSING
+# =========================
+# Maps what reception staff type ("short breath", "yellow eyes") to the
+# symptom names the model was trained on, and spots the red-flag phrases
+# behind the rule-based safety overrides (see rules.py). Aliases,
+# vocabulary names and override triggers are compiled into one
+# PhraseMatcher, so a note is scanned once for all of them, on whole-word
+# boundaries. Words the exact pass leaves unexplained are then looked up
+# typo-tolerantly.
+
+SYMPTOM_ALIASES = {
+
+    # =====================
+    # HEART
+    # =====================
+    "chest pain": "chest_pain",
+    "pressure in chest": "chest_pain",
+    "heart pain": "chest_pain",
+    "short breath": "breathlessness",
+    "shortness of breath": "breathlessness",
+    "difficulty breathing": "breathlessness",
+    "fast heart rate": "fast_heart_rate",
+    "rapid heartbeat": "fast_heart_rate",
+    "palpitations": "palpitations",
+    "sweating": "sweating",
+
+    # =====================
+    # RESPIRATORY
+    # =====================
+    "breathing problem": "breathlessness",
+    "breathing difficulty": "breathlessness",
+    "chest congestion": "congestion",
+    "cough": "cough",
+    "phlegm": "phlegm",
+    "mucus": "mucoid_sputum",
+    "runny nose": "runny_nose",
+    "sinus pressure": "sinus_pressure",
+    "wheezing": "phlegm",
+
+    # =====================
+    # BRAIN / NEURO
+    # =====================
+    "severe headache": "headache",
+    "headache": "headache",
+    "dizziness": "dizziness",
+    "confusion": "altered_sensorium",
+    "memory loss": "lack_of_concentration",
+    "blurred vision": "blurred_and_distorted_vision",
+    "loss of balance": "loss_of_balance",
+    "slurred speech": "slurred_speech",
+    "seizure": "coma",
+
+    # =====================
+    # LIVER
+    # =====================
+    "yellow skin": "yellowish_skin",
+    "yellow eyes": "yellowing_of_eyes",
+    "dark urine": "dark_urine",
+    "abdominal pain": "abdominal_pain",
+    "loss of appetite": "loss_of_appetite",
+    "alcohol history": "history_of_alcohol_consumption",
+
+    # =====================
+    # ENDOCRINE
+    # =====================
+    "weight gain": "weight_gain",
+    "weight loss": "weight_loss",
+    "fatigue": "fatigue",
+    "excessive hunger": "excessive_hunger",
+    "frequent urination": "polyuria",
+    "increased appetite": "increased_appetite",
+
+    # =====================
+    # MENTAL HEALTH
+    # =====================
+    "anxiety": "anxiety",
+    "panic": "anxiety",
+    "depression": "depression",
+    "mood swings": "mood_swings",
+    "irritability": "irritability",
+    "insomnia": "restlessness"
+}
+
+
+# Never start or end a fuzzy span on these
+STOPWORDS = {
+    "a", "an", "and", "at", "by", "for", "from", "has", "have", "in", "is",
+    "my", "no", "not", "of", "on", "or", "since", "the", "to", "with"
+}
+MAX_FUZZY_SPAN = 3  # tokens
+
+
+@dataclass(frozen=True)
+class ParsedText:
+    """Everything found in one free-text note"""
+    symptoms: frozenset
+    triggers: frozenset = field(default_factory=frozenset)  # override trigger phrases seen
+    corrections: tuple = ()  # (typed, known phrase) pairs accepted as typos
+
+
+class SymptomParser:
+    """Compiled exact and typo-tolerant matchers for a symptom vocabulary"""
+
+    def __init__(self, vocabulary, triggers=(), fuzzy=True):
+        self.vocabulary = list(vocabulary)
+        known = set(self.vocabulary)
+
+        phrases = []
+        # 1️⃣ Phrase-based smart matching
+        for phrase, canonical in SYMPTOM_ALIASES.items():
+            if canonical in known:
+                phrases.append((phrase, ("symptom", canonical)))
+        # 2️⃣ Exact fallback match (underscore-safe)
+        for s in self.vocabulary:
+            phrases.append((s.replace("_", " "), ("symptom", s)))
+        # 3️⃣ Override red flags (RuleEngine.phrases)
+        for phrase in triggers:
+            phrases.append((phrase, ("trigger", phrase)))
+
+        self.matcher = PhraseMatcher(phrases)
+
+        # Everything a phrase means, keyed by its normalised spelling
+        self.payloads = {}
+        for phrase, payload in phrases:
+            self.payloads.setdefault(" ".join(tokenize(phrase)), []).append(payload)
+        self.words = {w for phrase in self.payloads for w in phrase.split()}
+        self.fuzzy = TrigramIndex(self.payloads) if fuzzy else None
+
+    def scan(self, text):
+        tokens = tokenize(text)
+        hits = self.matcher.match_spans(tokens)
+
+        covered = [False] * len(tokens)
+        payloads = []
+        for start, end, payload in hits:
+            covered[start:end] = [True] * (end - start)
+            payloads.append(payload)
+
+        corrections = []
+        if self.fuzzy is not None:
+            for typed, phrase in self._fuzzy_spans(tokens, covered):
+                corrections.append((typed, phrase))
+                payloads.extend(self.payloads[phrase])
+
+        symptoms = {value for kind, value in payloads if kind == "symptom"}
+        triggers = {value for kind, value in payloads if kind == "trigger"}
+        return ParsedText(frozenset(symptoms), frozenset(triggers), tuple(corrections))
+
+    def _fuzzy_spans(self, tokens, covered):
+        """Greedy left-to-right typo matches over tokens the exact pass missed.
+
+        A span is only looked up if it holds a word no phrase uses (the typo)
+        and, when longer than one word, also a word some phrase does use.
+        """
+        i = 0
+        while i < len(tokens):
+            if covered[i] or tokens[i] in STOPWORDS:
+                i += 1
+                continue
+            for length in range(MAX_FUZZY_SPAN, 0, -1):
+                span = tokens[i:i + length]
+                if (len(span) < length or any(covered[i:i + length])
+                        or span[-1] in STOPWORDS):
+                    continue
+                known = sum(w in self.words for w in span)
+                if known == length or (length > 1 and not known):
+                    continue
+                typed = " ".join(span)
+                phrase = self.fuzzy.lookup(typed)
+                if phrase is not None:
+                    yield typed, phrase
+                    i += length
+                    break
+            else:
+                i += 1
+
+
+@lru_cache(maxsize=8)
+def get_parser(vocabulary, triggers=()):
+    """Shared SymptomParser for a vocabulary and trigger phrases (pass tuples)"""
+    return SymptomParser(vocabulary, triggers)
+
+
+def scan_text(text, vocabulary, rules=None):
+    """Symptoms, and the trigger phrases of a RuleEngine, in free text, in one pass"""
+    triggers = rules.phrases if rules is not None else ()
+    return get_parser(tuple(vocabulary), tuple(triggers)).scan(text)
+
+
+def parse_symptoms(text, vocabulary):
+    """Symptom names from vocabulary mentioned in free text"""
+    return set(scan_text(text, vocabulary).symptoms)
+
+
+def rule_based_override(parsed, rules):
+    """Safety override for a ParsedText scanned with the same RuleEngine, or None"""
+    if rules is None:
+        return None
+    rule = rules.check_phrases(parsed.triggers)
+    if rule is None:
+        return None
+    return {
+        "Category": rule.category,
+        "Doctor": rule.doctor,
+        "Confidence": "High (Rule-based Safety Override)"
+    }
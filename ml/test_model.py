@@ -1,7 +1,9 @@
-import pandas as pd
 import joblib
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import os
+import sys
+
+from dataset import load_dataset, TESTING_PATH
 
 # =========================
 # BASE DIRECTORY
@@ -17,48 +19,14 @@ model = joblib.load(model_path)
 # =========================
 # LOAD TEST DATA
 # =========================
-test_path = os.path.join(BASE_DIR, "..", "Dataset", "Testing.csv")
-test_data = pd.read_csv(test_path)
-
-# =========================
-# COLUMN CLEANING (MATCH TRAINING)
-# =========================
-test_data.columns = (
-    test_data.columns
-    .str.strip()
-    .str.lower()
-    .str.replace(" ", "_")
-    .str.replace("__+", "_", regex=True)
-    .str.replace(".", "", regex=False)
-)
-
-# =========================
-# REMOVE GARBAGE COLUMNS
-# =========================
-test_data = test_data.loc[
-    :, ~test_data.columns.str.contains("^unnamed", case=False)
-]
-
-test_data = test_data.loc[
-    :, ~test_data.columns.str.contains(r"\d+$", regex=True)
-]
-
-# =========================
-# SPLIT FEATURES & LABEL
-# =========================
-X_test = test_data.drop("prognosis", axis=1)
-y_test = test_data["prognosis"]
-
-# =========================
-# DISEASE → CATEGORY MAP
-# =========================
-map_path = os.path.join(BASE_DIR, "disease_category_map.csv")
-map_df = pd.read_csv(map_path)
-
-disease_map = dict(zip(map_df["disease"], map_df["category"]))
+# Cleaned columns and categories come from the cached feature store
+# (dataset.py), mapped exactly as train_model.py maps the training rows.
+# Another source (CSV, .csv.gz or zip member) can be passed on the command line
+test_path = sys.argv[1] if len(sys.argv) > 1 else TESTING_PATH
+test_data = load_dataset(test_path)
 
-y_test_category = y_test.map(disease_map)
-y_test_category.fillna("General", inplace=True)
+X_test = test_data.frame().drop(["prognosis", "category"], axis=1)
+y_test_category = test_data.category
 
 # =========================
 # ALIGN FEATURES
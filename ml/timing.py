@@ -0,0 +1,95 @@
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# =========================
+# STAGE LATENCY RECORDING
+# =========================
+# Where does a slow registration spend its time? Each stage of the
+# prediction path (text parsing, override rules, vectorization, model load,
+# scoring, post-processing) is wrapped in `with LATENCY.stage("name"):`,
+# which keeps the last LATENCY_SAMPLES durations per stage in memory. summary() turns
+# them into p50/p95/p99, and dump() writes them out as JSON so runs can be
+# compared offline.
+
+LATENCY_SAMPLES = 10000
+
+STAGES = ("parse", "override", "vectorize", "model_load", "score", "postprocess")
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class LatencyRecorder:
+    """Rolling per-stage latency samples, in milliseconds"""
+
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.samples = samples
+        self._stages = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, stage, ms):
+        with self._lock:
+            if stage not in self._stages:
+                self._stages[stage] = deque(maxlen=self.samples)
+                self._counts[stage] = 0
+            self._stages[stage].append(ms)
+            self._counts[stage] += 1
+
+    @contextmanager
+    def stage(self, name):
+        """Time the body of a with-block as one sample of stage name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def summary(self):
+        """{stage: {count, p50, p95, p99, max, mean}} over the kept samples, in ms"""
+        with self._lock:
+            stages = {name: (sorted(values), self._counts[name]) for name, values in self._stages.items()}
+        order = {name: i for i, name in enumerate(STAGES)}
+        out = {}
+        for name in sorted(stages, key=lambda n: (order.get(n, len(order)), n)):
+            values, count = stages[name]
+            out[name] = {
+                "count": count,
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+                "max": values[-1] if values else 0.0,
+                "mean": sum(values) / len(values) if values else 0.0,
+            }
+        return out
+
+    def to_json(self):
+        return json.dumps({
+            "started_at": self.started_at,
+            "dumped_at": time.time(),
+            "samples_per_stage": self.samples,
+            "stages": self.summary(),
+        }, indent=2)
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            f.write(self.to_json())
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counts.clear()
+            self.started_at = time.time()
+
+
+# Shared by everything in the process
+LATENCY = LatencyRecorder()
@@ -1,7 +1,14 @@
 import pandas as pd
 import os
+import argparse
 import joblib
-from sklearn.ensemble import RandomForestClassifier
+
+from forest import FlatForest, FLAT_MODEL_DIR
+from cascade import NaiveBayesStage, CASCADE_PATH
+from dataset import load_dataset, TRAINING_PATH, READ_CHUNK_ROWS
+from training import (balanced_rows, balanced_distinct_rows, balanced_sample_weight, fit_forest,
+                      stream_category_totals, streaming_class_weights, fit_incremental, STREAM_EPOCHS)
+from predict import file_hash
 
 # =========================
 # BASE DIRECTORY
@@ -9,95 +16,72 @@ from sklearn.ensemble import RandomForestClassifier
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # =========================
-# LOAD DATA
-# =========================
-data_path = os.path.join(BASE_DIR, "..", "Dataset", "Training.csv")
-df = pd.read_csv(data_path)
-
-print("✅ Training data loaded")
-print("📐 Shape:", df.shape)
-
-# =========================
-# CLEAN COLUMN NAMES
-# =========================
-df.columns = (
-    df.columns.str.strip()
-    .str.lower()
-    .str.replace(" ", "_")
-    .str.replace("__+", "_", regex=True)
-    .str.replace(".", "", regex=False)
-)
-
-# Remove unnamed + duplicate columns
-df = df.loc[:, ~df.columns.str.contains("^unnamed")]
-df = df.loc[:, ~df.columns.str.contains(r"\d+$", regex=True)]
-
-# =========================
-# LOAD DISEASE → CATEGORY MAP
-# =========================
-map_path = os.path.join(BASE_DIR, "disease_category_map.csv")
-map_df = pd.read_csv(map_path)
-
-disease_to_category = dict(
-    zip(map_df["disease"].str.strip().str.lower(),
-        map_df["category"].str.strip())
-)
-
-# =========================
-# MAP PROGNOSIS → CATEGORY
-# =========================
-df["category"] = df["prognosis"].str.strip().str.lower().map(disease_to_category)
-df["category"] = df["category"].fillna("General")
-
-# =========================
-# SEPARATE GENERAL / NON-GENERAL
-# =========================
-general_df = df[df["category"] == "General"]
-non_general_df = df[df["category"] != "General"]
-
-# =========================
-# BALANCE NON-GENERAL CLASSES
+# ARGUMENTS
 # =========================
-min_class_size = non_general_df["category"].value_counts().min()
-
-balanced_non_general = (
-    non_general_df
-    .groupby("category", group_keys=False)
-    .apply(lambda x: x.sample(min_class_size, random_state=42))
-)
+parser = argparse.ArgumentParser(description="Train the disease category model")
+parser.add_argument("source", nargs="?", default=TRAINING_PATH,
+                    help="training CSV, .csv.gz or zip member such as Dataset/archive.zip::Training.csv")
+parser.add_argument("--collapse-duplicates", action="store_true",
+                    help="fit on distinct (symptoms, category) rows weighted by how often they occur")
+parser.add_argument("--incremental", action="store_true",
+                    help="stream the source in chunks and fit a partial_fit logistic regression "
+                         "(constant memory, for corpora larger than RAM)")
+parser.add_argument("--epochs", type=int, default=STREAM_EPOCHS,
+                    help="passes over the source with --incremental")
+parser.add_argument("--chunk-size", type=int, default=READ_CHUNK_ROWS,
+                    help="rows held in memory at once with --incremental")
+args = parser.parse_args()
+if args.incremental and args.collapse_duplicates:
+    parser.error("--incremental and --collapse-duplicates cannot be combined")
 
 # =========================
-# LIMIT GENERAL CLASS (IMPORTANT)
-# =========================
-general_sample_size = min_class_size  # same as one category
-general_balanced = general_df.sample(
-    n=min(len(general_df), general_sample_size),
-    random_state=42
-)
-
-# =========================
-# FINAL TRAINING DATA
+# LOAD DATA
 # =========================
-final_df = pd.concat([balanced_non_general, general_balanced])
-final_df = final_df.sample(frac=1, random_state=42).reset_index(drop=True)
+# Cleaned columns and disease → category mapping come from the cached
+# feature store (dataset.py); the CSV is only re-parsed when it changes.
+# --incremental never holds the data: one streaming pass counts the
+# categories here, the fit streams it again
+if args.incremental:
+    columns, totals = stream_category_totals(args.source, chunk_size=args.chunk_size)
+    print("✅ Training data scanned")
+    print("📐 Shape:", (sum(totals.values()), len(columns)))
+else:
+    dataset = load_dataset(args.source)
+    columns = list(dataset.columns)
+    print("✅ Training data loaded")
+    print("📐 Shape:", (len(dataset), len(dataset.columns)))
+
+# =========================
+# BALANCE CATEGORIES
+# =========================
+# General is capped at the size of the smallest other category too
+# (see training.py)
+if args.incremental:
+    class_weights = streaming_class_weights(totals)
+    print("\n⚖️ Rows are weighted per category instead of sampled")
+    distribution = (pd.Series(totals) * pd.Series(class_weights)).round().astype(int)
+elif args.collapse_duplicates:
+    X, y, counts = balanced_distinct_rows(dataset)
+    print(f"\n🧮 Duplicates collapsed: {len(X)} distinct rows stand for {int(counts.sum())}")
+    distribution = pd.Series(counts, index=y).groupby(level=0).sum().astype(int)
+else:
+    final_df = balanced_rows(dataset.frame())
+    X = final_df.drop(["prognosis", "category"], axis=1)
+    y = final_df["category"]
+    counts = None
+    distribution = y.value_counts()
 
 print("\n📊 Category Distribution (After De-biasing):")
-print(final_df["category"].value_counts())
-
-# =========================
-# SPLIT FEATURES / LABEL
-# =========================
-X = final_df.drop(["prognosis", "category"], axis=1)
-y = final_df["category"]
+print(distribution.sort_values(ascending=False))
 
-print("🧾 Feature count:", X.shape[1])
+print("🧾 Feature count:", len(columns))
 
 # =========================
 # SAVE SYMPTOMS LIST
 # =========================
 symptoms_path = os.path.join(BASE_DIR, "..", "symptoms.txt")
 with open(symptoms_path, "w") as f:
-    for col in X.columns:
+    for col in columns:
         f.write(col + "\n")
 
 print("🧾 symptoms.txt regenerated")
@@ -105,16 +89,11 @@ print("🧾 symptoms.txt regenerated")
 # =========================
 # TRAIN MODEL
 # =========================
-model = RandomForestClassifier(
-    n_estimators=300,
-    max_depth=18,
-    min_samples_leaf=3,
-    class_weight="balanced",
-    random_state=42,
-    n_jobs=-1
-)
-
-model.fit(X, y)
+if args.incremental:
+    model = fit_incremental(args.source, columns, class_weights,
+                            chunk_size=args.chunk_size, epochs=args.epochs)
+else:
+    model = fit_forest(X, y, counts)
 
 # =========================
 # SAVE MODEL
@@ -122,5 +101,28 @@ model.fit(X, y)
 model_path = os.path.join(BASE_DIR, "model.pkl")
 joblib.dump(model, model_path)
 
+if args.incremental:
+    # No flat copy or cascade stage: the linear model is already cheap to
+    # score. predict.py ignores the ones left from an earlier forest, since
+    # they record the hash of the model.pkl they came from
+    print("\n✅ MODEL TRAINING COMPLETE")
+    print("📦 Incremental model saved as ml/model.pkl")
+    raise SystemExit(0)
+
+# =========================
+# SAVE MEMORY-MAPPABLE COPY
+# =========================
+FlatForest.from_model(model).save(FLAT_MODEL_DIR, source_hash=file_hash(model_path))
+
+# =========================
+# CASCADE FIRST STAGE
+# =========================
+# Same rows and class balancing as the forest, so the naive Bayes prior is
+# left flat the same way
+stage1 = NaiveBayesStage.fit(X.to_numpy(), y.to_numpy(), sample_weight=balanced_sample_weight(y, counts))
+stage1.save(CASCADE_PATH, source_hash=file_hash(model_path))
+
 print("\n✅ MODEL TRAINING COMPLETE")
 print("📦 Model saved as ml/model.pkl")
+print("📦 Flat copy saved as ml/model_flat/ (memory-mapped by predict.py)")
+print("📦 Cascade first stage saved as ml/model_stage1.npz (tune with tune_cascade.py)")
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+from collections import Counter
+
+from dataset import iter_frames, CATEGORY_MAP_PATH, LABEL_COLUMN, READ_CHUNK_ROWS
+
+# =========================
+# TRAINING RECIPE
+# =========================
+# How the category model is fitted, shared by train_model.py and the
+# training benchmarks: categories are balanced down to the smallest
+# non-General one (General included), then a class-balanced random forest
+# is fitted on what is left.
+#
+# balanced_distinct_rows() + fit_forest(counts=...) is the same recipe on
+# the distinct (symptoms, category) rows only, each weighted by how many
+# copies of it the full-row path would have kept.
+#
+# fit_incremental() is the out-of-core variant (see below).
+
+# Forest settings
+N_ESTIMATORS = 300
+MAX_DEPTH = 18
+MIN_SAMPLES_LEAF = 3
+MAX_FEATURES = "sqrt"
+RANDOM_STATE = 42
+
+
+def balanced_rows(df, random_state=RANDOM_STATE):
+    """Every category cut down to the size of the smallest non-General one"""
+    general_df = df[df["category"] == "General"]
+    non_general_df = df[df["category"] != "General"]
+
+    # Balance non-General classes
+    min_class_size = non_general_df["category"].value_counts().min()
+
+    balanced_non_general = (
+        non_general_df
+        .groupby("category", group_keys=False)
+        .apply(lambda x: x.sample(min_class_size, random_state=random_state))
+    )
+
+    # Limit the General class (IMPORTANT): same as one category
+    general_sample_size = min_class_size
+    general_balanced = general_df.sample(
+        n=min(len(general_df), general_sample_size),
+        random_state=random_state
+    )
+
+    final_df = pd.concat([balanced_non_general, general_balanced])
+    return final_df.sample(frac=1, random_state=random_state).reset_index(drop=True)
+
+
+def balanced_distinct_rows(dataset, random_state=RANDOM_STATE):
+    """balanced_rows() on distinct (symptoms, category) rows with copy counts.
+
+    Drawing min_class_size copies of a category without replacement is a
+    multivariate hypergeometric draw over its distinct rows' counts, so no
+    copy is ever materialised. Returns (X, y, counts) for the distinct rows
+    with at least one copy kept.
+    """
+    first, counts = dataset.distinct_rows()
+    categories = dataset.category[first]
+    rng = np.random.default_rng(random_state)
+
+    names, label = np.unique(categories, return_inverse=True)
+    totals = np.bincount(label, weights=counts).astype(np.int64)
+    min_class_size = totals[names != "General"].min()
+
+    kept = np.zeros(len(first), dtype=np.int64)
+    for c in range(len(names)):
+        rows = np.flatnonzero(label == c)
+        kept[rows] = rng.multivariate_hypergeometric(counts[rows], min(totals[c], min_class_size))
+
+    rows = np.flatnonzero(kept)
+    X = pd.DataFrame(dataset.X[first[rows]], columns=dataset.columns)
+    y = pd.Series(categories[rows], name="category")
+    return X, y, kept[rows].astype(np.float64)
+
+
+def balanced_sample_weight(y, counts=None):
+    """class_weight="balanced" as per-row weights, counting copies when given"""
+    counts = np.ones(len(y)) if counts is None else np.asarray(counts, dtype=np.float64)
+    class_totals = pd.Series(counts).groupby(np.asarray(y)).sum()
+    return counts * (counts.sum() / (len(class_totals) * class_totals))[np.asarray(y)].to_numpy()
+
+
+def fit_forest(X, y, counts=None, n_estimators=N_ESTIMATORS, max_depth=MAX_DEPTH,
+               min_samples_leaf=MIN_SAMPLES_LEAF, max_features=MAX_FEATURES,
+               random_state=RANDOM_STATE, n_jobs=-1):
+    """The category forest, fitted on rows or on distinct rows with copy counts.
+
+    sklearn computes class_weight="balanced" and min_samples_leaf over the
+    rows it is given, so with counts both are expressed in copies instead:
+    class weights from the weighted class totals, and a minimum leaf weight
+    of min_samples_leaf copies.
+
+    Bootstrapping is off with counts. sklearn's bootstrap draws distinct
+    rows uniformly, which leaves each pattern out of about a third of the
+    trees; a bootstrap of the copies almost never drops a pattern seen a
+    few times, so every tree seeing all the weighted rows is the closer
+    match (bench_collapse.py compares both against a reseeded refit).
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    if counts is None:
+        model = RandomForestClassifier(
+            n_estimators=n_estimators,
+            max_depth=max_depth,
+            min_samples_leaf=min_samples_leaf,
+            max_features=max_features,
+            class_weight="balanced",
+            random_state=random_state,
+            n_jobs=n_jobs
+        )
+        return model.fit(X, y)
+
+    model = RandomForestClassifier(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        min_weight_fraction_leaf=min_samples_leaf / np.sum(counts),
+        max_features=max_features,
+        bootstrap=False,
+        random_state=random_state,
+        n_jobs=n_jobs
+    )
+    return model.fit(X, y, sample_weight=balanced_sample_weight(y, counts))
+
+
+# =========================
+# OUT-OF-CORE TRAINING
+# =========================
+# For corpora that do not fit in memory. Nothing is materialised: the
+# source is streamed in chunks (dataset.iter_frames) once to count each
+# category, then STREAM_EPOCHS more times to fit a logistic-regression
+# SGDClassifier with partial_fit. Memory is one chunk plus the model,
+# whatever the corpus size.
+#
+# balanced_rows() caps every category, General included, at the smallest
+# non-General one and then weights the kept rows class-balanced, so every
+# category ends up with the same total weight. The counting pass gives
+# that directly as one weight per category, applied to every row instead
+# of to a sample. SGD shuffles the rows within each chunk; a corpus sorted
+# by disease over spans longer than a chunk should be shuffled beforehand.
+
+STREAM_EPOCHS = 5
+SGD_ALPHA = 1e-4
+
+
+def stream_category_totals(source, map_path=CATEGORY_MAP_PATH, chunk_size=READ_CHUNK_ROWS):
+    """(symptom columns, rows per category) of a source, in one streaming pass"""
+    columns, totals = None, Counter()
+    for chunk in iter_frames(source, map_path, chunk_size):
+        if columns is None:
+            columns = [c for c in chunk.columns if c not in (LABEL_COLUMN, "category")]
+        totals.update(chunk["category"].value_counts().to_dict())
+    return columns, totals
+
+
+def streaming_class_weights(totals):
+    """Per-row weight of each category reproducing balanced_rows() + class_weight="balanced" """
+    totals = pd.Series(totals, dtype=np.float64)
+    kept = totals.clip(upper=totals.drop("General", errors="ignore").min())
+    return (kept.sum() / (len(totals) * totals)).to_dict()
+
+
+def fit_incremental(source, columns, class_weights, map_path=CATEGORY_MAP_PATH,
+                    chunk_size=READ_CHUNK_ROWS, epochs=STREAM_EPOCHS, alpha=SGD_ALPHA,
+                    random_state=RANDOM_STATE):
+    """Logistic regression fitted chunk by chunk with partial_fit"""
+    from sklearn.linear_model import SGDClassifier
+    model = SGDClassifier(loss="log_loss", alpha=alpha, random_state=random_state)
+    classes = np.array(sorted(class_weights))
+    for _ in range(epochs):
+        for chunk in iter_frames(source, map_path, chunk_size):
+            # float64 is what SGD works on: converting first means sklearn
+            # does not copy again. Wrapping keeps the column names (feature_names_in_)
+            X = chunk.reindex(columns=columns, fill_value=0).to_numpy(np.float64)
+            X = pd.DataFrame(X, columns=columns, copy=False)
+            y = chunk["category"].to_numpy()
+            model.partial_fit(X, y, classes=classes,
+                              sample_weight=np.array([class_weights[c] for c in y]))
+    return model
@@ -0,0 +1,212 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from predict import Predictor, BASE_DIR
+from symptom_parser import get_parser
+
+# =========================
+# BULK FREE-TEXT TRIAGE
+# =========================
+# Gives a category to every patient whose Symptoms text was never scored
+# (registered without the AI checkbox, or before a model update). The input
+# is streamed in chunks, each chunk goes through the same pipeline as the
+# registration form (phrase matching -> safety overrides -> model) and the
+# results are appended to the output CSV in input order.
+#
+# After every chunk the job records how many input rows are done and how
+# long the output is in <output>.progress; a rerun with --resume cuts off
+# any half-written tail and carries on from there.
+
+PATIENTS_PATH = os.path.join(BASE_DIR, "..", "DSA part", "patients.csv")
+TRIAGE_CHUNK_SIZE = 20000
+TEXT_COLUMN = "Symptoms"
+
+
+def triage_frame(predictor, chunk, text_column=TEXT_COLUMN):
+    """Parse, override-check and score every row of a chunk of free-text notes.
+
+    Returns the chunk with detected_symptoms and the Predictor.append_scores()
+    columns added.
+    """
+    rules = predictor.rules
+    parser = get_parser(tuple(predictor.symptoms), rules.phrases if rules is not None else ())
+    texts = chunk[text_column].fillna("").astype(str).to_numpy()
+
+    # Intake notes repeat a lot ("fever", "cough"): parse each distinct one once
+    distinct, inverse = np.unique(texts, return_inverse=True)
+    scans = [parser.scan(t) for t in distinct]
+    parsed = [sorted(predictor.symptom_index[s] for s in scan.symptoms) for scan in scans]
+
+    # Overrides are decided on the trigger phrases in the text, as in the app
+    fired = None
+    if rules is not None:
+        rule_index = {rule: r for r, rule in enumerate(rules.rules)}
+        fired = np.array([rule_index.get(rules.check_phrases(scan.triggers), -1) for scan in scans],
+                         dtype=np.intp)[inverse]
+
+    lengths = np.array([len(p) for p in parsed], dtype=np.int64)
+    indptr = np.zeros(len(distinct) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter((i for p in parsed for i in p), dtype=np.int32, count=indptr[-1])
+    X = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.uint8), indices, indptr),
+        shape=(len(distinct), len(predictor.symptoms))
+    )[inverse]
+
+    out = chunk.reset_index(drop=True)
+    names = np.array([";".join(predictor.symptoms[i] for i in p) for p in parsed], dtype=object)
+    out["detected_symptoms"] = names[inverse]
+    return predictor.append_scores(out, X, fired=fired)
+
+
+def _triage_chunk(job):
+    import pool
+    chunk, text_column = job
+    return triage_frame(pool._predictor, chunk, text_column)
+
+
+# =========================
+# CHECKPOINTS
+# =========================
+def _progress_path(output_path):
+    return output_path + ".progress"
+
+
+def _input_fingerprint(path):
+    stat = os.stat(path)
+    return {"input": os.path.abspath(path), "input_size": stat.st_size, "input_mtime": stat.st_mtime}
+
+
+def load_checkpoint(input_path, output_path):
+    """Rows already done and output bytes to keep, if a matching checkpoint exists"""
+    try:
+        with open(_progress_path(output_path)) as f:
+            progress = json.load(f)
+    except (OSError, ValueError):
+        return None
+    fingerprint = _input_fingerprint(input_path)
+    if any(progress.get(k) != v for k, v in fingerprint.items()):
+        raise ValueError(f"{_progress_path(output_path)} was written for a different input file")
+    return progress
+
+
+def save_checkpoint(input_path, output_path, rows, output_bytes):
+    progress = dict(_input_fingerprint(input_path), rows=rows, output_bytes=output_bytes)
+    tmp_path = _progress_path(output_path) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, _progress_path(output_path))
+
+
+def _skip_rows(chunks, n):
+    """Drop the first n rows of a chunk stream"""
+    for chunk in chunks:
+        if n >= len(chunk):
+            n -= len(chunk)
+            continue
+        yield chunk.iloc[n:]
+        n = 0
+
+
+def triage_file(predictor, input_path, output_path, text_column=TEXT_COLUMN,
+                chunk_size=TRIAGE_CHUNK_SIZE, workers=1, resume=False, log=None):
+    """Triage a whole CSV of free-text notes with bounded memory.
+
+    With resume=True a checkpoint left by an interrupted run is picked up;
+    otherwise the output is started from scratch. Returns (rows triaged in
+    this run, seconds taken).
+    """
+    progress = load_checkpoint(input_path, output_path) if resume else None
+    done = progress["rows"] if progress else 0
+
+    chunks = pd.read_csv(input_path, chunksize=chunk_size, dtype=str, keep_default_na=False)
+    if done:
+        chunks = _skip_rows(chunks, done)
+        if log is not None:
+            log(f"  resuming after {done} rows")
+
+    scorer = None
+    if workers > 1:
+        from pool import PoolScorer
+        scorer = PoolScorer(workers, predictor=predictor)
+        triaged = scorer.map_ordered(_triage_chunk, ((c, text_column) for c in chunks))
+    else:
+        triaged = (triage_frame(predictor, c, text_column) for c in chunks)
+
+    rows = 0
+    start = time.perf_counter()
+    with open(output_path, "r+b" if progress else "wb") as out:
+        if progress:
+            out.truncate(progress["output_bytes"])
+            out.seek(0, os.SEEK_END)
+        try:
+            for frame in triaged:
+                out.write(frame.to_csv(header=out.tell() == 0, index=False).encode())
+                out.flush()
+                os.fsync(out.fileno())
+                rows += len(frame)
+                save_checkpoint(input_path, output_path, done + rows, out.tell())
+                if log is not None:
+                    elapsed = time.perf_counter() - start
+                    log(f"  {done + rows} rows triaged ({rows / elapsed:,.0f} rows/s)")
+        finally:
+            if scorer is not None:
+                scorer.close()
+    return rows, time.perf_counter() - start
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Triage free-text symptoms of a patient CSV")
+    parser.add_argument("input", nargs="?", default=PATIENTS_PATH,
+                        help="CSV with a free-text symptoms column (default: DSA part/patients.csv)")
+    parser.add_argument("--output", help="where to write results (default: <INPUT>_triage.csv)")
+    parser.add_argument("--in-place", action="store_true",
+                        help="replace the input file with the triaged rows once done")
+    parser.add_argument("--text-column", default=TEXT_COLUMN)
+    parser.add_argument("--chunk-size", type=int, default=TRIAGE_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run from its checkpoint")
+    parser.add_argument("--cascade", action="store_true",
+                        help="score with the naive Bayes first stage, escalating unsure rows to the forest")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = args.output or os.path.splitext(args.input)[0] + "_triage.csv"
+
+    # The web app rewrites patients.csv on every registration; --in-place
+    # must not overwrite a file that changed while it was being triaged
+    # (a resumed run's checkpoint already had to match this fingerprint)
+    input_before = _input_fingerprint(args.input)
+
+    print(f"📥 Triaging {args.input} on {args.workers} worker(s)")
+    rows, seconds = triage_file(
+        Predictor(cascade=args.cascade), args.input, output, args.text_column, args.chunk_size,
+        args.workers, args.resume, log=print
+    )
+    rate = rows / seconds if seconds > 0 else float("inf")
+    print(f"✅ {rows} rows in {seconds:.2f}s ({rate:,.0f} rows/s)")
+
+    if os.path.exists(_progress_path(output)):
+        os.remove(_progress_path(output))
+    if args.in_place:
+        if _input_fingerprint(args.input) != input_before:
+            print(f"⚠️ {args.input} changed during the run (new registrations?), so it was "
+                  f"not replaced. Results are in {output}; rerun to triage the current file")
+            return 1
+        os.replace(output, args.input)
+        output = args.input
+    print(f"📦 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
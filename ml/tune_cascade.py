@@ -0,0 +1,156 @@
+import sys
+import time
+import argparse
+import numpy as np
+
+from predict import Predictor
+from cascade import NaiveBayesStage, CASCADE_PATH, cascade_proba
+from dataset import load_dataset, TESTING_PATH
+
+# =========================
+# CASCADE THRESHOLD TUNING
+# =========================
+# For each candidate threshold, scores Testing.csv through the cascade and
+# reports accuracy, agreement with the forest, the share of rows escalated
+# and throughput. Testing.csv rows carry every symptom of their disease and
+# the first stage is near-certain on all of them, so the same curve is also
+# drawn for "sparse notes": each row with a fraction of its symptoms
+# dropped, which is where the two stages start to disagree.
+#
+# Throughput is measured on THROUGHPUT_ROWS rows (the test rows repeated)
+# without collapsing duplicates, so it reflects distinct intake rows.
+#
+# --save stores the fastest threshold that, on both sets, stays within
+# --max-drop accuracy points of the forest and names the forest's category
+# for at least --min-agreement of the rows. It goes in model_stage1.npz,
+# where Predictor(cascade=True) picks it up.
+
+THRESHOLDS = [0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99, 0.999, 0.9999, 0.99999]
+THROUGHPUT_ROWS = 20000
+DROP_FRACTION = 0.5
+MIN_AGREEMENT = 0.95
+REPEATS = 3
+SEED = 0
+
+
+def drop_symptoms(X, fraction, rng):
+    """Remove a random fraction of each row's symptoms, keeping at least one"""
+    out = np.zeros_like(X)
+    for i, row in enumerate(X):
+        present = np.flatnonzero(row)
+        keep = max(1, int(round(len(present) * (1 - fraction))))
+        out[i, rng.choice(present, keep, replace=False)] = 1
+    return out
+
+
+def rows_per_second(fn, X, repeats=REPEATS):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        best = min(best, time.perf_counter() - start)
+    return len(X) / best
+
+
+def curve(predictor, stage, X, labels, thresholds):
+    """One dict per threshold, plus the forest alone as threshold None"""
+    forest_pred = predictor.classes[predictor.forest_proba(X).argmax(axis=1)]
+    X_big = X[np.arange(THROUGHPUT_ROWS) % len(X)]
+
+    points = [{
+        "threshold": None,
+        "accuracy": (forest_pred == labels).mean(),
+        "agreement": 1.0,
+        "escalated": 1.0,
+        "rows_per_s": rows_per_second(predictor.forest_proba, X_big),
+    }]
+    for threshold in thresholds:
+        def run(rows):
+            return cascade_proba(stage, predictor.forest_proba, rows, threshold)
+
+        probs, escalated = run(X)
+        pred = predictor.classes[probs.argmax(axis=1)]
+        points.append({
+            "threshold": threshold,
+            "accuracy": (pred == labels).mean(),
+            "agreement": (pred == forest_pred).mean(),
+            "escalated": escalated.mean(),
+            "rows_per_s": rows_per_second(run, X_big),
+        })
+    return points
+
+
+def print_curve(name, points):
+    print(f"\n📋 {name}")
+    print(f"{'threshold':>10} {'accuracy':>9} {'agree':>7} {'escalated':>10} {'rows/s':>12}")
+    for p in points:
+        label = "forest" if p["threshold"] is None else f"{p['threshold']:g}"
+        print(f"{label:>10} {p['accuracy']:>9.1%} {p['agreement']:>7.1%} "
+              f"{p['escalated']:>10.1%} {p['rows_per_s']:>12,.0f}")
+
+
+def pick_threshold(curves, max_drop, min_agreement):
+    """Fastest threshold that is close enough to the forest on every curve"""
+    best = None
+    for i, threshold in enumerate(THRESHOLDS, start=1):
+        if all(c[i]["accuracy"] >= c[0]["accuracy"] - max_drop / 100
+               and c[i]["agreement"] >= min_agreement for c in curves):
+            speed = min(c[i]["rows_per_s"] for c in curves)
+            if best is None or speed > best[1]:
+                best = (threshold, speed)
+    return best[0] if best else None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Tune the cascade's escalation threshold on Testing.csv")
+    parser.add_argument("--drop", type=float, default=DROP_FRACTION,
+                        help="fraction of symptoms removed for the sparse-notes curve")
+    parser.add_argument("--max-drop", type=float, default=0.0,
+                        help="accuracy points the cascade may lose against the forest")
+    parser.add_argument("--min-agreement", type=float, default=MIN_AGREEMENT,
+                        help="share of rows that must get the forest's category")
+    parser.add_argument("--save", action="store_true",
+                        help="store the chosen threshold in model_stage1.npz")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    predictor = Predictor(cache_size=0)
+    try:
+        stage = NaiveBayesStage.load(CASCADE_PATH)
+    except OSError:
+        print("❌ No cascade first stage; run train_model.py first")
+        return 1
+    if stage.source_hash != predictor.model_hash:
+        print("❌ model_stage1.npz was trained with a different model.pkl; run train_model.py")
+        return 1
+
+    test_data = load_dataset(TESTING_PATH)
+    X = test_data.matrix(predictor.symptoms)
+    labels = test_data.category
+    sparse_notes = drop_symptoms(X, args.drop, np.random.default_rng(SEED))
+
+    print("⚖️ CASCADE THRESHOLD TUNING")
+    print("--------------------------------")
+    print(f"Current threshold     : {stage.threshold:g}")
+    curves = [curve(predictor, stage, X, labels, THRESHOLDS),
+              curve(predictor, stage, sparse_notes, labels, THRESHOLDS)]
+    print_curve(f"Testing.csv ({len(X)} rows)", curves[0])
+    print_curve(f"Sparse notes ({args.drop:.0%} of symptoms dropped)", curves[1])
+
+    chosen = pick_threshold(curves, args.max_drop, args.min_agreement)
+    criteria = f"within {args.max_drop} points of the forest, {args.min_agreement:.0%} agreement"
+    if chosen is None:
+        print(f"\n⚠️ No threshold is {criteria}")
+        return 1
+    print(f"\n✅ Fastest threshold {criteria}: {chosen:g}")
+    if args.save:
+        stage.threshold = chosen
+        stage.save(CASCADE_PATH)
+        print(f"📦 Saved to {CASCADE_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,7 @@
 import streamlit as st
 import pandas as pd
 import os
-import subprocess
-import csv
+import sys
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
@@ -14,11 +13,7 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATA_DIR = os.path.join(BASE_DIR, "DSA part")
 ML_DIR = os.path.join(BASE_DIR, "ml")
 
-PYTHON_EXE = os.path.join(BASE_DIR, "semester_project", "Scripts", "python.exe")
-PREDICT_SCRIPT = os.path.join(ML_DIR, "predict.py")
-
 SYMPTOMS_FILE = os.path.join(BASE_DIR, "symptoms.txt")
-AI_INPUT_FILE = os.path.join(BASE_DIR, "ai_input.csv")
 
 FILES = {
     "patients": os.path.join(DATA_DIR, "patients.csv"),
@@ -31,6 +26,13 @@ FILES = {
 
 os.makedirs(DATA_DIR, exist_ok=True)
 
+if ML_DIR not in sys.path:  # Streamlit reruns this script on every interaction
+    sys.path.insert(0, ML_DIR)
+from predict import format_result
+from reload import ReloadingPredictor
+from symptom_parser import scan_text, rule_based_override
+from timing import LATENCY
+
 # =========================
 # PAGE CONFIGURATION
 # =========================
@@ -148,16 +150,6 @@ st.markdown("""
 # =========================
 # UTILITY FUNCTIONS
 # =========================
-def extract_confidence(result_text):
-    for line in result_text.splitlines():
-        if "Confidence" in line:
-            try:
-                return float(line.split(":")[1].replace("%", "").strip())
-            except:
-                return None
-    return None
-
-
 def load_csv(name, cols):
     """Load CSV file or create empty DataFrame"""
     path = FILES[name]
@@ -174,13 +166,6 @@ def save_csv(df, name):
     os.makedirs(os.path.dirname(FILES[name]), exist_ok=True)
     df.to_csv(FILES[name], index=False)
 
-def load_symptoms():
-    """Load symptoms from file"""
-    if os.path.exists(SYMPTOMS_FILE):
-        with open(SYMPTOMS_FILE) as f:
-            return [x.strip() for x in f if x.strip()]
-    return []
-
 CATEGORY_TO_DOCTOR = {
     "Heart": "Cardiologist",
     "Brain": "Neurologist",
@@ -192,167 +177,25 @@ CATEGORY_TO_DOCTOR = {
 }
 
 
-SYMPTOM_ALIASES = {
-
-    # =====================
-    # HEART
-    # =====================
-    "chest pain": "chest_pain",
-    "pressure in chest": "chest_pain",
-    "heart pain": "chest_pain",
-    "short breath": "breathlessness",
-    "shortness of breath": "breathlessness",
-    "difficulty breathing": "breathlessness",
-    "fast heart rate": "fast_heart_rate",
-    "rapid heartbeat": "fast_heart_rate",
-    "palpitations": "palpitations",
-    "sweating": "sweating",
-
-    # =====================
-    # RESPIRATORY
-    # =====================
-    "breathing problem": "breathlessness",
-    "breathing difficulty": "breathlessness",
-    "chest congestion": "congestion",
-    "cough": "cough",
-    "phlegm": "phlegm",
-    "mucus": "mucoid_sputum",
-    "runny nose": "runny_nose",
-    "sinus pressure": "sinus_pressure",
-    "wheezing": "phlegm",
-
-    # =====================
-    # BRAIN / NEURO
-    # =====================
-    "severe headache": "headache",
-    "headache": "headache",
-    "dizziness": "dizziness",
-    "confusion": "altered_sensorium",
-    "memory loss": "lack_of_concentration",
-    "blurred vision": "blurred_and_distorted_vision",
-    "loss of balance": "loss_of_balance",
-    "slurred speech": "slurred_speech",
-    "seizure": "coma",
-
-    # =====================
-    # LIVER
-    # =====================
-    "yellow skin": "yellowish_skin",
-    "yellow eyes": "yellowing_of_eyes",
-    "dark urine": "dark_urine",
-    "abdominal pain": "abdominal_pain",
-    "loss of appetite": "loss_of_appetite",
-    "alcohol history": "history_of_alcohol_consumption",
-
-    # =====================
-    # ENDOCRINE
-    # =====================
-    "weight gain": "weight_gain",
-    "weight loss": "weight_loss",
-    "fatigue": "fatigue",
-    "excessive hunger": "excessive_hunger",
-    "frequent urination": "polyuria",
-    "increased appetite": "increased_appetite",
-
-    # =====================
-    # MENTAL HEALTH
-    # =====================
-    "anxiety": "anxiety",
-    "panic": "anxiety",
-    "depression": "depression",
-    "mood swings": "mood_swings",
-    "irritability": "irritability",
-    "insomnia": "restlessness"
-}
-
-
-def create_ai_input(user_text):
-    """Create AI input file with smart symptom matching"""
-    all_symptoms = load_symptoms()
-    if not all_symptoms:
-        return False
-
-    user_text = user_text.lower()
-    detected = set()
+def scan_symptoms(user_text, pred):
+    """Find a model version's symptoms and override trigger phrases in free text"""
+    with LATENCY.stage("parse"):
+        return scan_text(user_text, pred.symptoms, pred.rules)
 
-    # 1️⃣ Phrase-based smart matching
-    for phrase, canonical in SYMPTOM_ALIASES.items():
-        if phrase in user_text:
-            detected.add(canonical)
 
-    # 2️⃣ Exact fallback match (underscore-safe)
-    for s in all_symptoms:
-        if s.replace("_", " ") in user_text:
-            detected.add(s)
+@st.cache_resource
+def get_predictor():
+    """Load the AI model once per server process, shared by all sessions.
 
-    # 3️⃣ Write AI input
-    with open(AI_INPUT_FILE, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(all_symptoms + ["prognosis"])
-        row = [1 if s in detected else 0 for s in all_symptoms]
-        row.append("?")
-        writer.writerow(row)
+    A retrained model.pkl or edited symptoms.txt is picked up in the
+    background without restarting Streamlit.
+    """
+    return ReloadingPredictor(symptoms_path=SYMPTOMS_FILE).start()
 
-    return True
 
-def rule_based_override(symptoms_text):
-    text = symptoms_text.lower()
-
-    # Heart-related red flags
-    heart_triggers = [
-        "chest pain",
-        "short breath",
-        "shortness of breath",
-        "difficulty breathing",
-        "sweating",
-        "palpitations",
-        "fast heart rate"
-    ]
-
-    heart_score = sum(1 for t in heart_triggers if t in text)
-
-    if heart_score >= 2:
-        return {
-            "Category": "Heart",
-            "Doctor": "Cardiologist",
-            "Confidence": "High (Rule-based Safety Override)"
-        }
-
-    # Respiratory-related red flags
-    respiratory_triggers = [
-        "breathing problem",
-        "breathing difficulty",
-        "shortness of breath",
-        "cough",
-        "phlegm",
-        "chest congestion",
-        "wheezing"
-    ]
-
-    resp_score = sum(1 for t in respiratory_triggers if t in text)
-
-    if resp_score >= 2:
-        return {
-            "Category": "Respiratory",
-            "Doctor": "Pulmonologist",
-            "Confidence": "High (Rule-based Safety Override)"
-        }
-
-    return None
-
-
-def run_ai_prediction():
-    """Run AI prediction script"""
-    try:
-        result = subprocess.run(
-            [PYTHON_EXE, PREDICT_SCRIPT],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        return result.stdout
-    except Exception as e:
-        return f"Error running prediction: {str(e)}"
+def run_ai_prediction(detected, pred):
+    """Run AI prediction in-process on the detected symptom names"""
+    return pred.predict(detected)
 
 def get_next_id(df, id_col="ID"):
     """Get next available ID"""
@@ -389,7 +232,8 @@ menu = st.sidebar.radio(
         "💳 Billing System",
         "📅 Appointment Scheduling",
         "🚨 Emergency Cases",
-        "📊 Analytics & Reports"
+        "📊 Analytics & Reports",
+        "⏱️ AI Latency"
     ]
 )
 
@@ -565,30 +409,36 @@ elif menu == "👤 Patient Management":
                     
                     if use_ai:
                         with st.spinner("🤖 Running AI prediction..."):
-                            override = rule_based_override(symptoms)
-
-                            if override:
-                                st.session_state.ai_result = (
-                                    "AI MEDICAL ASSISTANT RESULT\n"
-                                    "----------------------------\n"
-                                    "Disease Identified : Possible Heart Condition\n"
-                                    f"Category           : {override['Category']}\n"
-                                    f"Confidence          : {override['Confidence']}\n"
-                                    f"Recommended Doctor  : {override['Doctor']}\n"
-                                    "----------------------------"
-                                )
+                            if not os.path.exists(SYMPTOMS_FILE):
+                                st.session_state.ai_result = "AI prediction unavailable - symptoms file not found"
                             else:
-                                if create_ai_input(symptoms):
-                                    st.session_state.ai_result = run_ai_prediction()
-                                    conf = extract_confidence(st.session_state.ai_result)
-                                    if conf is not None and conf < 55:
-                                        st.session_state.ai_result += (
-                                            "\n⚠️ NOTE: Low confidence prediction.\n"
-                                            "Patient should be reviewed by a General Physician first."
-                                        )
-
+                                try:
+                                    # Parse, override-check and predict on one model version
+                                    pred = get_predictor().current
+                                    parsed = scan_symptoms(symptoms, pred)
+                                    with LATENCY.stage("override"):
+                                        override = rule_based_override(parsed, pred.rules)
+                                    result = None if override else run_ai_prediction(parsed.symptoms, pred)
+                                except Exception as e:
+                                    st.session_state.ai_result = f"Error running prediction: {str(e)}"
                                 else:
-                                    st.session_state.ai_result = "AI prediction unavailable - symptoms file not found"
+                                    if override:
+                                        st.session_state.ai_result = (
+                                            "AI MEDICAL ASSISTANT RESULT\n"
+                                            "----------------------------\n"
+                                            "Disease Identified : Possible Heart Condition\n"
+                                            f"Category           : {override['Category']}\n"
+                                            f"Confidence          : {override['Confidence']}\n"
+                                            f"Recommended Doctor  : {override['Doctor']}\n"
+                                            "----------------------------"
+                                        )
+                                    else:
+                                        st.session_state.ai_result = format_result(result)
+                                        if result.needs_review:
+                                            st.session_state.ai_result += (
+                                                "\n⚠️ NOTE: Low confidence prediction.\n"
+                                                "Patient should be reviewed by a General Physician first."
+                                            )
 
                 else:
                     st.error("❌ Please fill all required fields marked with *")
@@ -1708,6 +1558,61 @@ elif menu == "📊 Analytics & Reports":
         else:
             st.info("No financial records available yet")
 
+# =========================
+# 9. AI LATENCY (ADMIN)
+# =========================
+elif menu == "⏱️ AI Latency":
+    st.title("⏱️ AI Prediction Latency")
+    st.caption("Rolling timings of each stage of the registration → prediction path, in milliseconds")
+
+    status = get_predictor().status()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Model Version", status["version"])
+    with col2:
+        st.metric("Model Reloads", status["reloads"])
+    with col3:
+        st.metric("Loaded At", datetime.fromtimestamp(status["loaded_at"]).strftime("%H:%M:%S"))
+
+    # Hits/misses of the current model version only: a reload starts a new cache
+    cache = get_predictor().current.cache.stats()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Cache Hit Rate", f"{cache['hit_rate']:.1%}")
+    with col2:
+        st.metric("Cache Hits / Misses", f"{cache['hits']} / {cache['misses']}")
+    with col3:
+        st.metric("Cached Combinations", f"{cache['size']} / {cache['capacity']}")
+
+    st.markdown("---")
+
+    summary = LATENCY.summary()
+    if summary:
+        stages_df = pd.DataFrame.from_dict(summary, orient="index").rename_axis("Stage").reset_index()
+        st.dataframe(stages_df.round(3), use_container_width=True, hide_index=True)
+
+        fig = go.Figure([
+            go.Bar(name=q, x=stages_df["Stage"], y=stages_df[q.lower()])
+            for q in ("P50", "P95", "P99")
+        ])
+        fig.update_layout(barmode="group", title="Latency per Stage", yaxis_title="ms")
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No predictions timed yet - register a patient with AI enabled")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="📥 Download JSON",
+            data=LATENCY.to_json(),
+            file_name=f"ai_latency_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json"
+        )
+    with col2:
+        if st.button("🔄 Reset Timings"):
+            LATENCY.reset()
+            st.rerun()
+
 # =========================
 # END OF APPLICATION
 # =========================